@@ -25,10 +25,22 @@ logger = logging.getLogger(__name__)
 class AlertManager:
     """预警管理器"""
     
-    def __init__(self, external_alert_api_url: str = "http://localhost:8081"):
-        """初始化预警管理器"""
-        self.query_engine = QueryEngine()
-        self.webhook_client = LarkWebhookClient()
+    def __init__(
+        self,
+        external_alert_api_url: str = "http://localhost:8081",
+        query_engine: Optional[QueryEngine] = None,
+        webhook_client: Optional[LarkWebhookClient] = None
+    ):
+        """
+        初始化预警管理器
+        
+        Args:
+            external_alert_api_url: 外部预警接收API的URL
+            query_engine: 共享的查询引擎，为空则新建
+            webhook_client: 共享的Webhook客户端，为空则新建
+        """
+        self.query_engine = query_engine or QueryEngine()
+        self.webhook_client = webhook_client or LarkWebhookClient()
         self.db_client = mongodb_client
         
         # 外部预警接收API的URL
@@ -60,8 +72,9 @@ class AlertManager:
             # 生成规则ID
             rule_id = str(uuid.uuid4())
             alert_rule.id = rule_id
-            alert_rule.created_at = datetime.utcnow()
-            alert_rule.updated_at = datetime.utcnow()
+            now = datetime.utcnow()
+            alert_rule.created_at = now
+            alert_rule.updated_at = now
             
             # 保存到数据库
             rule_dict = alert_rule.dict()
@@ -21,11 +21,26 @@ logger = logging.getLogger(__name__)
 class AlertMCPTools:
     """预警系统MCP工具集"""
     
-    def __init__(self):
-        """初始化工具集"""
-        self.query_engine = QueryEngine()
-        self.alert_manager = AlertManager()
-        self.webhook_client = LarkWebhookClient()
+    def __init__(
+        self,
+        query_engine: Optional[QueryEngine] = None,
+        alert_manager: Optional[AlertManager] = None,
+        webhook_client: Optional[LarkWebhookClient] = None
+    ):
+        """
+        初始化工具集
+        
+        Args:
+            query_engine: 共享的查询引擎，为空则新建
+            alert_manager: 共享的预警管理器，为空则新建
+            webhook_client: 共享的Webhook客户端，为空则新建
+        """
+        self.query_engine = query_engine or QueryEngine()
+        self.webhook_client = webhook_client or LarkWebhookClient()
+        self.alert_manager = alert_manager or AlertManager(
+            query_engine=self.query_engine,
+            webhook_client=self.webhook_client
+        )
     
     def get_tool_definitions(self) -> List[Dict[str, Any]]:
         """
@@ -6,7 +6,7 @@ import logging
 import time
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
-from database.mongo_client import mongodb_client
+from database.mongo_client import mongodb_client, SIGNALS_INDEX_FILTER
 from .models import (
     QueryRequest, QueryResult, QueryCondition, LogicalCondition,
     QueryOperator, QueryField, LogicalOperator
@@ -137,7 +137,11 @@ class QueryEngine:
                 raise ValueError("BETWEEN操作符需要包含两个值的列表")
         elif operator == QueryOperator.CONTAINS:
             if condition.field == QueryField.SIGNALS:
-                return {field_name: {"$in": [value] if isinstance(value, str) else value}}
+                # 包含信号的K线一定满足部分索引的过滤条件，显式加上以便使用信号索引
+                return {
+                    field_name: {"$in": [value] if isinstance(value, str) else value},
+                    **SIGNALS_INDEX_FILTER
+                }
             else:
                 return {field_name: {"$regex": str(value), "$options": "i"}}
         elif operator == QueryOperator.NOT_CONTAINS:
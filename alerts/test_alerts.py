@@ -6,9 +6,11 @@
 import asyncio
 import json
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, '..')
@@ -29,16 +31,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 测试输出经队列交给后台线程写出，避免测试过程中同步写终端
+_output_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_output_handler = logging.StreamHandler(sys.stdout)
+_output_handler.setFormatter(logging.Formatter('%(message)s'))
+_output_listener = QueueListener(_output_queue, _output_handler)
+
+output = logging.getLogger(f"{__name__}.output")
+output.setLevel(logging.INFO)
+output.addHandler(QueueHandler(_output_queue))
+output.propagate = False
+
+# 测试用例描述：(测试名称, 协程工厂, 校验函数)
+TestSpec = Tuple[str, Callable[[], Awaitable[Any]], Callable[[Any], Optional[str]]]
+
+
+def _check_symbol(expected: str, error: str) -> Callable[[Any], Optional[str]]:
+    """校验查询结果的币种符号"""
+    return lambda result: None if result.symbol == expected else error
+
+
+def _check_success(error_key: str, default_error: str) -> Callable[[Any], Optional[str]]:
+    """校验返回字典中的success标志"""
+    return lambda result: None if result.get("success") else result.get(error_key, default_error)
+
 
 class AlertSystemTester:
     """预警系统测试器"""
     
+    __slots__ = ("_query_engine", "_alert_manager", "_webhook_client", "_mcp_tools", "test_results")
+    
     def __init__(self):
-        """初始化测试器"""
-        self.query_engine = QueryEngine()
-        self.alert_manager = AlertManager()
-        self.webhook_client = LarkWebhookClient()
-        self.mcp_tools = AlertMCPTools()
+        """初始化测试器，各组件在首次使用时才创建，并共享同一个Webhook客户端"""
+        self._query_engine: Optional[QueryEngine] = None
+        self._alert_manager: Optional[AlertManager] = None
+        self._webhook_client: Optional[LarkWebhookClient] = None
+        self._mcp_tools: Optional[AlertMCPTools] = None
         
         self.test_results = {
             "passed": 0,
@@ -46,10 +74,45 @@ class AlertSystemTester:
             "errors": []
         }
     
+    @property
+    def query_engine(self) -> QueryEngine:
+        """查询引擎"""
+        if self._query_engine is None:
+            self._query_engine = QueryEngine()
+        return self._query_engine
+    
+    @property
+    def webhook_client(self) -> LarkWebhookClient:
+        """Webhook客户端"""
+        if self._webhook_client is None:
+            self._webhook_client = LarkWebhookClient()
+        return self._webhook_client
+    
+    @property
+    def alert_manager(self) -> AlertManager:
+        """预警管理器"""
+        if self._alert_manager is None:
+            self._alert_manager = AlertManager(
+                query_engine=self.query_engine,
+                webhook_client=self.webhook_client
+            )
+        return self._alert_manager
+    
+    @property
+    def mcp_tools(self) -> AlertMCPTools:
+        """MCP工具集"""
+        if self._mcp_tools is None:
+            self._mcp_tools = AlertMCPTools(
+                query_engine=self.query_engine,
+                alert_manager=self.alert_manager,
+                webhook_client=self.webhook_client
+            )
+        return self._mcp_tools
+    
     async def run_all_tests(self):
         """运行所有测试"""
-        print("🧪 开始预警系统测试...")
-        print("=" * 60)
+        output.info("🧪 开始预警系统测试...")
+        output.info("%s", "=" * 60)
         
         # 测试查询引擎
         await self._test_query_engine()
@@ -66,143 +129,139 @@ class AlertSystemTester:
         # 显示测试结果
         self._show_results()
     
+    async def _run_specs(self, specs: List[TestSpec]):
+        """
+        并发执行相互独立的测试用例，并按声明顺序校验结果
+        
+        Args:
+            specs: (测试名称, 协程工厂, 校验函数) 列表，校验函数通过时返回None，失败时返回错误信息
+        """
+        async def _guarded(name: str, factory: Callable[[], Awaitable[Any]]):
+            output.info("  测试%s...", name)
+            try:
+                return await factory(), None
+            except Exception as e:
+                return None, e
+        
+        async with asyncio.TaskGroup() as tg:
+            handles = [
+                (name, tg.create_task(_guarded(name, factory)), validator)
+                for name, factory, validator in specs
+            ]
+        
+        for name, task, validator in handles:
+            result, error = task.result()
+            if error is not None:
+                self._fail_test(name, str(error))
+                continue
+            
+            failure = validator(result)
+            if failure is None:
+                self._pass_test(name)
+            else:
+                self._fail_test(name, failure)
+    
     async def _test_query_engine(self):
         """测试查询引擎"""
-        print("\n🔍 测试查询引擎...")
+        output.info("\n🔍 测试查询引擎...")
         
-        try:
-            # 测试基础查询
-            print("  测试基础价格查询...")
-            query_request = QueryRequest(
-                symbol="BTC",
-                timeframes=["1h"],
-                conditions=QueryCondition(
-                    field=QueryField.CLOSE,
-                    operator=QueryOperator.GT,
-                    value=40000
-                ),
-                limit=10
-            )
-            
-            result = await self.query_engine.execute_query(query_request)
-            
-            if result.symbol == "BTC":
-                self._pass_test("基础价格查询")
-            else:
-                self._fail_test("基础价格查询", "返回的符号不正确")
-            
-            # 测试信号查询
-            print("  测试信号查询...")
-            signal_query = QueryRequest(
-                symbol="BTC",
-                timeframes=["1h"],
-                conditions=QueryCondition(
-                    field=QueryField.SIGNALS,
-                    operator=QueryOperator.CONTAINS,
-                    value="RSI_OVERSOLD"
-                ),
-                limit=5
-            )
-            
-            signal_result = await self.query_engine.execute_query(signal_query)
-            
-            if signal_result.symbol == "BTC":
-                self._pass_test("信号查询")
-            else:
-                self._fail_test("信号查询", "查询失败")
-            
-            # 测试复合条件查询
-            print("  测试复合条件查询...")
-            complex_query = QueryRequest(
-                symbol="BTC",
-                timeframes=["1h"],
-                conditions=LogicalCondition(
-                    operator="and",
-                    conditions=[
-                        QueryCondition(
-                            field=QueryField.CLOSE,
-                            operator=QueryOperator.GT,
-                            value=45000
-                        ),
-                        QueryCondition(
-                            field=QueryField.RSI,
-                            operator=QueryOperator.LT,
-                            value=30
-                        )
-                    ]
-                ),
-                limit=5
-            )
-            
-            complex_result = await self.query_engine.execute_query(complex_query)
-            
-            if complex_result.symbol == "BTC":
-                self._pass_test("复合条件查询")
-            else:
-                self._fail_test("复合条件查询", "查询失败")
-            
-        except Exception as e:
-            self._fail_test("查询引擎测试", str(e))
+        price_query = QueryRequest(
+            symbol="BTC",
+            timeframes=["1h"],
+            conditions=QueryCondition(
+                field=QueryField.CLOSE,
+                operator=QueryOperator.GT,
+                value=40000
+            ),
+            limit=10
+        )
+        
+        signal_query = QueryRequest(
+            symbol="BTC",
+            timeframes=["1h"],
+            conditions=QueryCondition(
+                field=QueryField.SIGNALS,
+                operator=QueryOperator.CONTAINS,
+                value="RSI_OVERSOLD"
+            ),
+            limit=5
+        )
+        
+        complex_query = QueryRequest(
+            symbol="BTC",
+            timeframes=["1h"],
+            conditions=LogicalCondition(
+                operator="and",
+                conditions=[
+                    QueryCondition(
+                        field=QueryField.CLOSE,
+                        operator=QueryOperator.GT,
+                        value=45000
+                    ),
+                    QueryCondition(
+                        field=QueryField.RSI,
+                        operator=QueryOperator.LT,
+                        value=30
+                    )
+                ]
+            ),
+            limit=5
+        )
+        
+        execute = self.query_engine.execute_query
+        await self._run_specs([
+            ("基础价格查询", lambda: execute(price_query), _check_symbol("BTC", "返回的符号不正确")),
+            ("信号查询", lambda: execute(signal_query), _check_symbol("BTC", "查询失败")),
+            ("复合条件查询", lambda: execute(complex_query), _check_symbol("BTC", "查询失败")),
+        ])
     
     async def _test_webhook_client(self):
         """测试Webhook客户端"""
-        print("\n📨 测试Webhook客户端...")
+        output.info("\n📨 测试Webhook客户端...")
         
-        try:
-            # 测试文本消息
-            print("  测试Lark文本消息...")
-            result = await self.webhook_client.send_text_message(
-                "📊 预警系统测试消息 - " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            )
-            
-            if result.get("success"):
-                self._pass_test("Lark文本消息发送")
-            else:
-                self._fail_test("Lark文本消息发送", result.get("error", "未知错误"))
-            
-            # 测试卡片消息
-            print("  测试Lark卡片消息...")
-            card_result = await self.webhook_client.send_card_message(
-                header_title="🧪 预警系统功能测试",
-                fields={
-                    "测试时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "测试内容": "卡片消息发送测试",
-                    "系统状态": "正常运行"
-                }
-            )
-            
-            if card_result.get("success"):
-                self._pass_test("Lark卡片消息发送")
-            else:
-                self._fail_test("Lark卡片消息发送", card_result.get("error", "未知错误"))
-            
-            # 测试加密货币预警消息
-            print("  测试加密货币预警消息...")
-            crypto_result = await self.webhook_client.send_crypto_alert(
-                alert_type="测试预警",
-                symbol="BTC",
-                timeframe="1h",
-                price=50000.0,
-                indicator_name="RSI",
-                indicator_value=25.5,
-                signal_name="RSI_OVERSOLD"
-            )
-            
-            if crypto_result.get("success"):
-                self._pass_test("加密货币预警消息")
-            else:
-                self._fail_test("加密货币预警消息", crypto_result.get("error", "未知错误"))
-            
-        except Exception as e:
-            self._fail_test("Webhook客户端测试", str(e))
+        client = self.webhook_client
+        await self._run_specs([
+            (
+                "Lark文本消息发送",
+                lambda: client.send_text_message(
+                    "📊 预警系统测试消息 - " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                ),
+                _check_success("error", "未知错误")
+            ),
+            (
+                "Lark卡片消息发送",
+                lambda: client.send_card_message(
+                    header_title="🧪 预警系统功能测试",
+                    fields={
+                        "测试时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "测试内容": "卡片消息发送测试",
+                        "系统状态": "正常运行"
+                    }
+                ),
+                _check_success("error", "未知错误")
+            ),
+            (
+                "加密货币预警消息",
+                lambda: client.send_crypto_alert(
+                    alert_type="测试预警",
+                    symbol="BTC",
+                    timeframe="1h",
+                    price=50000.0,
+                    indicator_name="RSI",
+                    indicator_value=25.5,
+                    signal_name="RSI_OVERSOLD"
+                ),
+                _check_success("error", "未知错误")
+            ),
+        ])
     
     async def _test_alert_manager(self):
         """测试预警管理器"""
-        print("\n⚠️ 测试预警管理器...")
+        output.info("\n⚠️ 测试预警管理器...")
         
         try:
             # 创建测试预警规则
-            print("  测试创建预警规则...")
+            output.info("  测试创建预警规则...")
             test_rule = AlertRule(
                 name="测试BTC价格预警",
                 description="BTC价格超过60000时的测试预警",
@@ -227,7 +286,7 @@ class AlertSystemTester:
                 self._fail_test("创建预警规则", "未返回规则ID")
             
             # 测试获取预警规则
-            print("  测试获取预警规则...")
+            output.info("  测试获取预警规则...")
             retrieved_rule = await self.alert_manager.get_alert_rule(rule_id)
             
             if retrieved_rule and retrieved_rule.name == "测试BTC价格预警":
@@ -236,7 +295,7 @@ class AlertSystemTester:
                 self._fail_test("获取预警规则", "规则不存在或内容不匹配")
             
             # 测试列出预警规则
-            print("  测试列出预警规则...")
+            output.info("  测试列出预警规则...")
             rules = await self.alert_manager.list_alert_rules(symbol="BTC")
             
             if any(rule.id == rule_id for rule in rules):
@@ -245,7 +304,7 @@ class AlertSystemTester:
                 self._fail_test("列出预警规则", "找不到刚创建的规则")
             
             # 测试更新预警规则
-            print("  测试更新预警规则...")
+            output.info("  测试更新预警规则...")
             update_success = await self.alert_manager.update_alert_rule(
                 rule_id, 
                 {"description": "更新后的测试描述"}
@@ -257,7 +316,7 @@ class AlertSystemTester:
                 self._fail_test("更新预警规则", "更新失败")
             
             # 测试预警规则
-            print("  测试预警规则测试功能...")
+            output.info("  测试预警规则测试功能...")
             test_result = await self.alert_manager.test_alert_rule(rule_id)
             
             if test_result.get("success"):
@@ -266,7 +325,7 @@ class AlertSystemTester:
                 self._fail_test("预警规则测试", test_result.get("error", "测试失败"))
             
             # 测试获取统计信息
-            print("  测试获取预警统计...")
+            output.info("  测试获取预警统计...")
             stats = await self.alert_manager.get_alert_stats()
             
             if stats.total_rules > 0:
@@ -275,7 +334,7 @@ class AlertSystemTester:
                 self._fail_test("获取预警统计", "统计信息为空")
             
             # 清理测试数据
-            print("  清理测试数据...")
+            output.info("  清理测试数据...")
             delete_success = await self.alert_manager.delete_alert_rule(rule_id)
             
             if delete_success:
@@ -288,86 +347,12 @@ class AlertSystemTester:
     
     async def _test_mcp_tools(self):
         """测试MCP工具"""
-        print("\n🔧 测试MCP工具...")
+        output.info("\n🔧 测试MCP工具...")
         
-        try:
-            # 测试灵活查询工具
-            print("  测试灵活查询工具...")
-            query_result = await self.mcp_tools.execute_tool(
-                "flexible_crypto_query",
-                {
-                    "symbol": "BTC",
-                    "timeframes": ["1h"],
-                    "conditions": {
-                        "field": "close",
-                        "operator": "gt",
-                        "value": 40000
-                    },
-                    "limit": 5
-                }
-            )
-            
-            if query_result.get("success"):
-                self._pass_test("灵活查询工具")
-            else:
-                self._fail_test("灵活查询工具", query_result.get("message", "查询失败"))
-            
-            # 测试交易信号查询工具
-            print("  测试交易信号查询工具...")
-            signal_result = await self.mcp_tools.execute_tool(
-                "query_trading_signals",
-                {
-                    "symbol": "BTC",
-                    "timeframes": ["1h"],
-                    "signal_names": ["RSI_OVERSOLD", "MACD_GOLDEN_CROSS"],
-                    "periods": 24
-                }
-            )
-            
-            if signal_result.get("success"):
-                self._pass_test("交易信号查询工具")
-            else:
-                self._fail_test("交易信号查询工具", signal_result.get("message", "查询失败"))
-            
-            # 测试价格分析工具
-            print("  测试价格分析工具...")
-            price_result = await self.mcp_tools.execute_tool(
-                "analyze_price_levels",
-                {
-                    "symbol": "BTC",
-                    "timeframes": ["1h"],
-                    "price_level": 50000,
-                    "analysis_type": "breakout",
-                    "periods": 48
-                }
-            )
-            
-            if price_result.get("success"):
-                self._pass_test("价格分析工具")
-            else:
-                self._fail_test("价格分析工具", price_result.get("message", "分析失败"))
-            
-            # 测试指标极值分析工具
-            print("  测试指标极值分析工具...")
-            indicator_result = await self.mcp_tools.execute_tool(
-                "analyze_indicator_extremes",
-                {
-                    "symbol": "BTC",
-                    "timeframes": ["1h"],
-                    "indicator": "rsi",
-                    "comparison": "historical_high",
-                    "lookback_periods": 100
-                }
-            )
-            
-            if indicator_result.get("success"):
-                self._pass_test("指标极值分析工具")
-            else:
-                self._fail_test("指标极值分析工具", indicator_result.get("message", "分析失败"))
-            
-            # 测试创建价格预警工具
-            print("  测试创建价格预警工具...")
-            alert_result = await self.mcp_tools.execute_tool(
+        execute_tool = self.mcp_tools.execute_tool
+        
+        async def create_price_alert_and_cleanup():
+            alert_result = await execute_tool(
                 "create_price_alert",
                 {
                     "name": "MCP测试价格预警",
@@ -380,90 +365,141 @@ class AlertSystemTester:
                 }
             )
             
-            if alert_result.get("success"):
-                self._pass_test("创建价格预警工具")
-                
-                # 清理创建的预警规则
-                rule_id = alert_result.get("rule_id")
-                if rule_id:
-                    await self.alert_manager.delete_alert_rule(rule_id)
-            else:
-                self._fail_test("创建价格预警工具", alert_result.get("message", "创建失败"))
-            
-            # 测试Webhook测试工具
-            print("  测试Webhook测试工具...")
-            webhook_result = await self.mcp_tools.execute_tool(
-                "test_webhook",
-                {
-                    "message_type": "text",
-                    "test_message": "MCP工具Webhook测试消息"
-                }
-            )
-            
-            if webhook_result.get("success"):
-                self._pass_test("Webhook测试工具")
-            else:
-                self._fail_test("Webhook测试工具", webhook_result.get("message", "测试失败"))
-            
-            # 测试获取统计工具
-            print("  测试获取统计工具...")
-            stats_result = await self.mcp_tools.execute_tool(
-                "get_alert_statistics",
-                {}
-            )
-            
-            if stats_result.get("success"):
-                self._pass_test("获取统计工具")
-            else:
-                self._fail_test("获取统计工具", stats_result.get("message", "获取失败"))
+            # 清理创建的预警规则
+            rule_id = alert_result.get("rule_id")
+            if alert_result.get("success") and rule_id:
+                await self.alert_manager.delete_alert_rule(rule_id)
             
-        except Exception as e:
-            self._fail_test("MCP工具测试", str(e))
+            return alert_result
+        
+        await self._run_specs([
+            (
+                "灵活查询工具",
+                lambda: execute_tool(
+                    "flexible_crypto_query",
+                    {
+                        "symbol": "BTC",
+                        "timeframes": ["1h"],
+                        "conditions": {
+                            "field": "close",
+                            "operator": "gt",
+                            "value": 40000
+                        },
+                        "limit": 5
+                    }
+                ),
+                _check_success("message", "查询失败")
+            ),
+            (
+                "交易信号查询工具",
+                lambda: execute_tool(
+                    "query_trading_signals",
+                    {
+                        "symbol": "BTC",
+                        "timeframes": ["1h"],
+                        "signal_names": ["RSI_OVERSOLD", "MACD_GOLDEN_CROSS"],
+                        "periods": 24
+                    }
+                ),
+                _check_success("message", "查询失败")
+            ),
+            (
+                "价格分析工具",
+                lambda: execute_tool(
+                    "analyze_price_levels",
+                    {
+                        "symbol": "BTC",
+                        "timeframes": ["1h"],
+                        "price_level": 50000,
+                        "analysis_type": "breakout",
+                        "periods": 48
+                    }
+                ),
+                _check_success("message", "分析失败")
+            ),
+            (
+                "指标极值分析工具",
+                lambda: execute_tool(
+                    "analyze_indicator_extremes",
+                    {
+                        "symbol": "BTC",
+                        "timeframes": ["1h"],
+                        "indicator": "rsi",
+                        "comparison": "historical_high",
+                        "lookback_periods": 100
+                    }
+                ),
+                _check_success("message", "分析失败")
+            ),
+            ("创建价格预警工具", create_price_alert_and_cleanup, _check_success("message", "创建失败")),
+            (
+                "Webhook测试工具",
+                lambda: execute_tool(
+                    "test_webhook",
+                    {
+                        "message_type": "text",
+                        "test_message": "MCP工具Webhook测试消息"
+                    }
+                ),
+                _check_success("message", "测试失败")
+            ),
+            ("获取统计工具", lambda: execute_tool("get_alert_statistics", {}), _check_success("message", "获取失败")),
+        ])
     
     def _pass_test(self, test_name: str):
         """标记测试通过"""
         self.test_results["passed"] += 1
-        print(f"    ✅ {test_name}: 通过")
+        output.info("    ✅ %s: 通过", test_name)
     
     def _fail_test(self, test_name: str, error: str):
         """标记测试失败"""
         self.test_results["failed"] += 1
         self.test_results["errors"].append(f"{test_name}: {error}")
-        print(f"    ❌ {test_name}: 失败 - {error}")
+        output.info("    ❌ %s: 失败 - %s", test_name, error)
     
     def _show_results(self):
         """显示测试结果"""
-        print("\n" + "=" * 60)
-        print("📊 测试结果汇总")
-        print(f"总测试数: {self.test_results['passed'] + self.test_results['failed']}")
-        print(f"通过: {self.test_results['passed']}")
-        print(f"失败: {self.test_results['failed']}")
+        output.info("\n%s", "=" * 60)
+        output.info("📊 测试结果汇总")
+        output.info("总测试数: %d", self.test_results['passed'] + self.test_results['failed'])
+        output.info("通过: %d", self.test_results['passed'])
+        output.info("失败: %d", self.test_results['failed'])
         
         success_rate = (self.test_results["passed"] / (self.test_results['passed'] + self.test_results['failed'])) * 100
-        print(f"成功率: {success_rate:.1f}%")
+        output.info("成功率: %.1f%%", success_rate)
         
         if self.test_results["errors"]:
-            print("\n❌ 失败的测试:")
+            output.info("\n❌ 失败的测试:")
             for error in self.test_results["errors"]:
-                print(f"  - {error}")
+                output.info("  - %s", error)
         
         if success_rate >= 80:
-            print("\n🎉 预警系统测试总体通过！")
+            output.info("\n🎉 预警系统测试总体通过！")
         else:
-            print("\n⚠️ 预警系统测试存在问题，请检查上述错误")
+            output.info("\n⚠️ 预警系统测试存在问题，请检查上述错误")
 
 
 async def main():
     """主函数"""
+    _output_listener.start()
     try:
         tester = AlertSystemTester()
         await tester.run_all_tests()
     except KeyboardInterrupt:
-        print("\n⚠️ 测试被用户中断")
+        output.info("\n⚠️ 测试被用户中断")
     except Exception as e:
-        print(f"\n❌ 测试过程中发生严重错误: {e}")
+        output.info("\n❌ 测试过程中发生严重错误: %s", e)
         logger.error(f"测试异常: {e}", exc_info=True)
+    finally:
+        _output_listener.stop()
 
 
 if __name__ == '__main__':
+    # 优先使用uvloop事件循环，未安装时回退到默认事件循环
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main()) 
\ No newline at end of file
@@ -2,36 +2,171 @@
 Lark Webhook客户端
 用于发送预警消息到飞书群聊
 """
-import aiohttp
+import httpx
 import asyncio
 import logging
 import json
-from typing import Dict, Any, Optional, List
+import re
+import time
+import orjson
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Final, Tuple, Union
 from datetime import datetime
+from utils.request_utils import now_iso
 
 logger = logging.getLogger(__name__)
 
+# 预警类型对应的卡片标题颜色
+_COLOR_MAPPING: Final[Dict[str, str]] = {
+    "价格突破": "red",
+    "价格跌破": "red",
+    "指标超买": "orange",
+    "指标超卖": "green",
+    "指标突破": "blue",
+    "信号检测": "blue",
+    "模式匹配": "purple",
+    "自定义查询": "grey"
+}
+
+# 预警类型对应的操作建议模板，{symbol} 在使用时填充
+_SUGGESTION_TEMPLATES: Final[Dict[str, str]] = {
+    "价格突破": "🔥 {symbol}价格突破关键阻力位，可能继续上涨，建议关注趋势延续",
+    "价格跌破": "⚠️ {symbol}价格跌破关键支撑位，注意风险控制",
+    "指标超买": "📈 {symbol}技术指标显示超买状态，可能面临回调压力",
+    "指标超卖": "📉 {symbol}技术指标显示超卖状态，可能存在反弹机会",
+    "指标突破": "📊 {symbol}技术指标出现重要突破，关注趋势变化",
+    "信号检测": "🎯 {symbol}出现重要技术信号，建议结合其他指标确认",
+    "模式匹配": "🔍 {symbol}出现特定技术形态，关注后续发展"
+}
+
+_DEFAULT_SUGGESTION_TEMPLATE: Final[str] = "📱 {symbol}触发预警，请关注市场变化"
+
+# 预警卡片中视为无内容、发送前会被去掉的字段值
+_EMPTY_FIELD_VALUES: Final[Tuple[Optional[str], ...]] = (None, "", "无描述", "见详细信息")
+
+# 单条消息的默认发送超时（秒）
+_SEND_TIMEOUT: Final[float] = 10.0
+
+# JSON请求头，作为会话默认请求头统一设置
+_JSON_HEADERS: Final[Dict[str, str]] = {'Content-Type': 'application/json'}
+
+def _fmt_dt(dt: datetime) -> str:
+    """将时间格式化为 YYYY-MM-DD HH:MM:SS（避免strftime的locale开销）"""
+    return f"{dt.year:04}-{dt.month:02}-{dt.day:02} {dt.hour:02}:{dt.minute:02}:{dt.second:02}"
+
+
+# 预编译卡片模板的缓存数量上限：字段名中包含指标名等动态内容，不能无限增长
+_CARD_TEMPLATE_CACHE_SIZE: Final[int] = 128
+
+# 占位符 "\x00{序号}\x00" 经orjson序列化后的形式
+_PLACEHOLDER_PATTERN = re.compile(rb"\\u0000(\d+)\\u0000")
+
+
+@lru_cache(maxsize=_CARD_TEMPLATE_CACHE_SIZE)
+def _compile_card_template(header_color: str, keys: Tuple[str, ...]) -> Tuple[Tuple[bytes, ...], Tuple[int, ...]]:
+    """
+    将指定结构的卡片消息预序列化为JSON片段（按 (标题颜色, 字段名) 缓存最近使用的模板）
+    
+    Args:
+        header_color: 标题颜色
+        keys: 字段名（按显示顺序）
+        
+    Returns:
+        Tuple: (JSON片段, 各片段之后需要填充的占位符序号)，序号0为标题，其余为字段值
+    """
+    payload = {
+        "msg_type": "interactive",
+        "card": {
+            "elements": [
+                {"tag": "div", "text": {"tag": "lark_md", "content": f"**{key}:** \x00{index}\x00"}}
+                for index, key in enumerate(keys, start=1)
+            ],
+            "header": {
+                "title": {
+                    "content": "\x000\x00",
+                    "tag": "plain_text"
+                },
+                "template": header_color
+            }
+        }
+    }
+    
+    parts = _PLACEHOLDER_PATTERN.split(orjson.dumps(payload))
+    return tuple(parts[0::2]), tuple(int(index) for index in parts[1::2])
+
+
+def _render_card(header_title: str, fields: Dict[str, Any], header_color: str) -> bytes:
+    """
+    使用预编译模板渲染卡片消息，仅对可变内容做JSON转义
+    
+    Args:
+        header_title: 卡片标题
+        fields: 字段内容
+        header_color: 标题颜色
+        
+    Returns:
+        bytes: 序列化后的消息载荷
+    """
+    segments, slots = _compile_card_template(header_color, tuple(fields))
+    values = [header_title, *fields.values()]
+    
+    chunks = [segments[0]]
+    for slot, segment in zip(slots, segments[1:]):
+        chunks.append(orjson.dumps(str(values[slot]))[1:-1])
+        chunks.append(segment)
+    return b"".join(chunks)
+
 
 class LarkWebhookClient:
     """飞书Webhook客户端"""
     
-    def __init__(self, default_webhook_url: str = None):
+    __slots__ = ("default_webhook_url", "session", "rpm", "_tokens", "_last", "_rate_lock")
+    
+    def __init__(self, default_webhook_url: str = None, rpm: int = 100):
         """
         初始化客户端
         
         Args:
             default_webhook_url: 默认的webhook URL
+            rpm: 每分钟允许发送的消息数（令牌桶容量）
         """
         self.default_webhook_url = default_webhook_url or "https://open.larksuite.com/open-apis/bot/v2/hook/2691e416-0374-4181-b195-9e1de11968da"
         self.session = None
+        
+        # 令牌桶限流，避免突发预警触发Lark的429限制
+        self.rpm = rpm
+        self._tokens: float = float(rpm)
+        self._last = time.monotonic()
+        self._rate_lock = asyncio.Lock()
     
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """获取HTTP客户端会话"""
-        if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=10)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+    async def _get_session(self) -> httpx.AsyncClient:
+        """获取HTTP客户端会话（HTTP/2，多条消息复用同一连接）"""
+        if self.session is None or self.session.is_closed:
+            # 超时由_send_message按请求的投递期限控制
+            self.session = httpx.AsyncClient(
+                http2=True,
+                timeout=None,
+                headers=_JSON_HEADERS,
+                limits=httpx.Limits(max_keepalive_connections=16)
+            )
         return self.session
     
+    async def _acquire_token(self):
+        """从令牌桶获取一个发送令牌，令牌不足时等待补充"""
+        async with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(self.rpm, self._tokens + (now - self._last) * self.rpm / 60)
+            self._last = now
+            
+            if self._tokens < 1:
+                wait_seconds = (1 - self._tokens) * 60 / self.rpm
+                logger.debug(f"Lark消息发送限流，等待 {wait_seconds:.2f} 秒")
+                await asyncio.sleep(wait_seconds)
+                self._tokens = 1.0
+                self._last = time.monotonic()
+            
+            self._tokens -= 1
+    
     async def send_text_message(
         self, 
         text: str, 
@@ -125,16 +260,10 @@ class LarkWebhookClient:
         url = webhook_url or self.default_webhook_url
         
         # 构建卡片内容
-        elements = []
-        
-        for key, value in fields.items():
-            elements.append({
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"**{key}:** {value}"
-                }
-            })
+        elements = [
+            {"tag": "div", "text": {"tag": "lark_md", "content": f"**{key}:** {value}"}}
+            for key, value in fields.items()
+        ]
         
         payload = {
             "msg_type": "interactive",
@@ -207,7 +336,7 @@ class LarkWebhookClient:
             "预警类型": alert_type,
             "监控币种": symbol,
             "监控周期": timeframe,
-            "触发时间": trigger_time.strftime("%Y-%m-%d %H:%M:%S UTC"),
+            "触发时间": f"{_fmt_dt(trigger_time)} UTC",
             "触发条件": trigger_condition
         }
         
@@ -242,40 +371,20 @@ class LarkWebhookClient:
         if suggestion:
             fields["操作建议"] = suggestion
         
-        # 根据预警类型选择颜色和图标
-        color_mapping = {
-            "价格突破": "red",
-            "价格跌破": "red",
-            "指标超买": "orange", 
-            "指标超卖": "green",
-            "指标突破": "blue",
-            "信号检测": "blue",
-            "模式匹配": "purple",
-            "自定义查询": "grey"
-        }
+        # 去掉空值和占位内容，减小卡片载荷
+        fields = {key: value for key, value in fields.items() if value not in _EMPTY_FIELD_VALUES}
         
-        header_color = color_mapping.get(alert_type, "blue")
+        # 根据预警类型选择颜色和图标
+        header_color = _COLOR_MAPPING.get(alert_type, "blue")
         
-        return await self.send_card_message(
-            header_title=title,
-            fields=fields,
-            webhook_url=webhook_url,
-            header_color=header_color
-        )
+        # 预警卡片结构固定，直接使用预编译模板渲染
+        url = webhook_url or self.default_webhook_url
+        return await self._send_message(url, _render_card(title, fields, header_color))
     
     def _generate_action_suggestion(self, alert_type: str, symbol: str, comparison_result: Optional[str]) -> Optional[str]:
         """根据预警类型生成操作建议"""
-        suggestions = {
-            "价格突破": f"🔥 {symbol}价格突破关键阻力位，可能继续上涨，建议关注趋势延续",
-            "价格跌破": f"⚠️ {symbol}价格跌破关键支撑位，注意风险控制",
-            "指标超买": f"📈 {symbol}技术指标显示超买状态，可能面临回调压力",
-            "指标超卖": f"📉 {symbol}技术指标显示超卖状态，可能存在反弹机会",
-            "指标突破": f"📊 {symbol}技术指标出现重要突破，关注趋势变化",
-            "信号检测": f"🎯 {symbol}出现重要技术信号，建议结合其他指标确认",
-            "模式匹配": f"🔍 {symbol}出现特定技术形态，关注后续发展"
-        }
-        
-        base_suggestion = suggestions.get(alert_type, f"📱 {symbol}触发预警，请关注市场变化")
+        template = _SUGGESTION_TEMPLATES.get(alert_type, _DEFAULT_SUGGESTION_TEMPLATE)
+        base_suggestion = template.format(symbol=symbol)
         
         # 添加基于对比结果的具体建议
         if comparison_result and "大于" in comparison_result:
@@ -337,63 +446,138 @@ class LarkWebhookClient:
             webhook_url=webhook_url
         )
     
-    async def _send_message(self, webhook_url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _send_message(
+        self,
+        webhook_url: str,
+        payload: Union[Dict[str, Any], bytes],
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         发送消息的内部方法
         
         Args:
             webhook_url: Webhook URL
-            payload: 消息载荷
+            payload: 消息载荷，可以是字典或已序列化的JSON字节
+            deadline: 投递期限（time.monotonic()时间），默认为当前时间加发送超时
             
         Returns:
             Dict: 发送结果
         """
+        if deadline is None:
+            deadline = time.monotonic() + _SEND_TIMEOUT
+        
         try:
-            session = await self._get_session()
+            await self._acquire_token()
             
-            headers = {
-                'Content-Type': 'application/json'
-            }
+            # 限流等待后已超出投递期限则直接放弃，不再发起请求
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error("发送Lark消息超出投递期限")
+                return {
+                    "success": False,
+                    "error": "超出投递期限",
+                    "timestamp": now_iso()
+                }
             
-            logger.debug(f"发送Lark消息到: {webhook_url}")
-            logger.debug(f"消息内容: {json.dumps(payload, ensure_ascii=False, indent=2)}")
+            # 非调试模式下走精简发送路径，调试模式保留完整的请求/响应日志
+            if not logger.isEnabledFor(logging.DEBUG):
+                body = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+                return await asyncio.wait_for(self._send_fast(webhook_url, body), timeout=remaining)
             
-            async with session.post(webhook_url, json=payload, headers=headers) as response:
-                response_text = await response.text()
-                
-                try:
-                    response_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    response_data = {"raw_response": response_text}
-                
-                result = {
-                    "success": response.status == 200,
-                    "status_code": response.status,
-                    "response": response_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-                if response.status == 200:
-                    logger.info("Lark消息发送成功")
-                else:
-                    logger.error(f"Lark消息发送失败: {response.status} - {response_text}")
-                
-                return result
+            return await asyncio.wait_for(self._send_verbose(webhook_url, payload), timeout=remaining)
                 
         except asyncio.TimeoutError:
             logger.error("发送Lark消息超时")
             return {
                 "success": False,
                 "error": "发送超时",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now_iso()
             }
         except Exception as e:
             logger.error(f"发送Lark消息异常: {e}")
             return {
                 "success": False,
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now_iso()
+            }
+    
+    async def _send_fast(self, webhook_url: str, body: bytes) -> Dict[str, Any]:
+        """
+        精简发送路径：载荷已序列化，成功时不解析响应内容，失败时保留响应内容
+        
+        Args:
+            webhook_url: Webhook URL
+            body: 已序列化的JSON消息载荷
+            
+        Returns:
+            Dict: 发送结果
+        """
+        session = await self._get_session()
+        
+        response = await session.post(webhook_url, content=body)
+        if response.status_code == 200:
+            logger.info("Lark消息发送成功")
+            return {
+                "success": True,
+                "status_code": 200,
+                "timestamp": now_iso()
             }
+        
+        logger.error(f"Lark消息发送失败: {response.status_code} - {response.text}")
+        return {
+            "success": False,
+            "status_code": response.status_code,
+            "response": response.text,
+            "timestamp": now_iso()
+        }
+    
+    async def _send_verbose(self, webhook_url: str, payload: Union[Dict[str, Any], bytes]) -> Dict[str, Any]:
+        """
+        完整发送路径：记录请求内容并返回包含响应详情的结果
+        
+        Args:
+            webhook_url: Webhook URL
+            payload: 消息载荷，可以是字典或已序列化的JSON字节
+            
+        Returns:
+            Dict: 发送结果
+        """
+        session = await self._get_session()
+        
+        logger.debug(f"发送Lark消息到: {webhook_url}")
+        if isinstance(payload, bytes):
+            logger.debug(f"消息内容: {payload.decode('utf-8')}")
+            body = payload
+        else:
+            logger.debug(f"消息内容: {json.dumps(payload, ensure_ascii=False, indent=2)}")
+            body = orjson.dumps(payload)
+        
+        response = await session.post(webhook_url, content=body)
+        if response.status_code == 200:
+            try:
+                response_data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                response_data = {"raw_response": response.text}
+            
+            result = {
+                "success": True,
+                "status_code": 200,
+                "response": response_data,
+                "timestamp": now_iso()
+            }
+            
+            logger.info("Lark消息发送成功")
+        else:
+            result = {
+                "success": False,
+                "status_code": response.status_code,
+                "response": response.text,
+                "timestamp": now_iso()
+            }
+            
+            logger.error(f"Lark消息发送失败: {response.status_code} - {response.text}")
+        
+        return result
     
     async def test_webhook(self, webhook_url: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -407,7 +591,7 @@ class LarkWebhookClient:
         """
         url = webhook_url or self.default_webhook_url
         
-        test_message = f"🔧 Webhook测试消息 - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}"
+        test_message = f"🔧 Webhook测试消息 - {_fmt_dt(datetime.utcnow())} UTC"
         
         result = await self.send_text_message(test_message, url)
         
@@ -420,6 +604,6 @@ class LarkWebhookClient:
     
     async def close(self):
         """关闭HTTP会话"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if self.session and not self.session.is_closed:
+            await self.session.aclose()
             self.session = None 
\ No newline at end of file
@@ -3,11 +3,33 @@ Flask API应用主文件
 创建和配置Flask应用
 """
 import logging
-from flask import Flask, jsonify
-from flask_cors import CORS
-from .routes import api_bp
-from alerts.api_routes import alerts_bp
+import os
+from flask import Flask, jsonify, request
 from utils.logger import setup_logging
+from .serialization import ORJSONProvider
+
+# 跨域请求支持：所有来源均允许访问 /api/*，响应头固定不变，预先构建
+_CORS_PATH_PREFIX = '/api/'
+_CORS_ORIGIN_HEADER = ('Access-Control-Allow-Origin', '*')
+_CORS_PREFLIGHT_HEADERS = (
+    _CORS_ORIGIN_HEADER,
+    ('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type, Authorization'),
+    # 浏览器缓存预检结果24小时
+    ('Access-Control-Max-Age', '86400'),
+)
+
+# 是否注册预警系统API（预警模块依赖较多，不需要时可关闭以加快worker启动）
+ENABLE_ALERTS = os.getenv('ENABLE_ALERTS', '1') == '1'
+
+# 预警系统端点（仅在启用时出现在根路径的端点列表中）
+_ALERT_ENDPOINTS = {
+    'alerts_health': '/api/v1/alerts/health',
+    'alerts_query': '/api/v1/alerts/query',
+    'alerts_rules': '/api/v1/alerts/rules',
+    'alerts_webhook_test': '/api/v1/alerts/webhook/test',
+    'alerts_stats': '/api/v1/alerts/stats'
+}
 
 
 def create_app(config=None):
@@ -20,35 +42,50 @@ def create_app(config=None):
     Returns:
         Flask: 配置好的Flask应用实例
     """
+    # 设置日志（先于蓝图导入，以记录数据库连接等导入期日志）
+    setup_logging()
+    
     # 创建Flask应用
     app = Flask(__name__)
     
-    # 基础配置
-    app.config.update({
-        'JSON_AS_ASCII': False,  # 支持中文
-        'JSONIFY_PRETTYPRINT_REGULAR': True,  # JSON格式化
-        'JSON_SORT_KEYS': False,  # 保持JSON字段顺序
-    })
+    # 使用orjson序列化JSON响应（原生UTF-8输出，保持字段顺序）
+    app.json = ORJSONProvider(app)
     
     # 如果有自定义配置，应用它
     if config:
         app.config.update(config)
     
-    # 设置日志
-    setup_logging()
+    # 启用CORS（跨域请求支持）：预检请求直接返回204，其余响应附加允许来源头
+    @app.before_request
+    def handle_cors_preflight():
+        """直接响应 /api/* 的OPTIONS预检请求"""
+        if request.method == 'OPTIONS' and request.path.startswith(_CORS_PATH_PREFIX):
+            return app.response_class(status=204, headers=_CORS_PREFLIGHT_HEADERS)
     
-    # 启用CORS（跨域请求支持）
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": "*",
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
-        }
-    })
+    @app.after_request
+    def add_cors_headers(response):
+        """为 /api/* 的响应添加跨域头"""
+        if request.path.startswith(_CORS_PATH_PREFIX):
+            response.headers.setdefault(*_CORS_ORIGIN_HEADER)
+        return response
     
-    # 注册蓝图
+    # 注册蓝图（在此处导入，避免导入api.app时加载数据库与预警模块）
+    from .routes import api_bp
     app.register_blueprint(api_bp)
-    app.register_blueprint(alerts_bp)  # 添加预警系统API
+    
+    endpoints = {
+        'health': '/api/v1/health',
+        'signals_post': '/api/v1/signals',
+        'signals_get': '/api/v1/signals/<symbol>',
+        'symbols': '/api/v1/symbols',
+        'docs': '/api/v1/docs'
+    }
+    
+    if ENABLE_ALERTS:
+        # 添加预警系统API
+        from alerts.api_routes import alerts_bp
+        app.register_blueprint(alerts_bp)
+        endpoints.update(_ALERT_ENDPOINTS)
     
     # 根路径处理
     @app.route('/')
@@ -59,19 +96,7 @@ def create_app(config=None):
             'version': 'v1.0.0',
             'status': 'running',
             'description': '提供加密货币技术分析信号的RESTful API服务',
-            'endpoints': {
-                'health': '/api/v1/health',
-                'signals_post': '/api/v1/signals',
-                'signals_get': '/api/v1/signals/<symbol>',
-                'symbols': '/api/v1/symbols',
-                'docs': '/api/v1/docs',
-                # 预警系统端点
-                'alerts_health': '/api/v1/alerts/health',
-                'alerts_query': '/api/v1/alerts/query',
-                'alerts_rules': '/api/v1/alerts/rules',
-                'alerts_webhook_test': '/api/v1/alerts/webhook/test',
-                'alerts_stats': '/api/v1/alerts/stats'
-            },
+            'endpoints': endpoints,
             'documentation': '/api/v1/docs'
         })
     
@@ -80,7 +105,7 @@ def create_app(config=None):
     def handle_exception(e):
         """处理未捕获的异常"""
         logger = logging.getLogger(__name__)
-        logger.error(f"未捕获的异常: {e}", exc_info=True)
+        logger.error("未捕获的异常: %s", e, exc_info=True)
         
         return jsonify({
             'success': False,
@@ -0,0 +1,76 @@
+"""
+响应压缩工具
+对已序列化的JSON响应按客户端支持的编码进行Brotli/Gzip压缩，并缓存压缩结果
+"""
+import gzip
+import threading
+from typing import Optional, Tuple
+from cachetools import LRUCache
+
+try:
+    import brotli
+except ImportError:  # 未安装brotli时仅使用gzip
+    brotli = None
+
+# 小于该大小的响应不压缩，压缩收益抵不过头部与CPU开销
+COMPRESS_MIN_SIZE = 1024
+
+# 压缩级别：Brotli 4 / Gzip 6 在压缩率与CPU耗时之间较为均衡
+BROTLI_QUALITY = 4
+GZIP_LEVEL = 6
+
+# 压缩结果缓存：(ETag, 编码) -> 压缩后的字节，ETag相同则内容相同
+COMPRESSED_CACHE_MAXSIZE = 2048
+
+# 按优先级排列的可用编码
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+_compressed_cache: LRUCache = LRUCache(maxsize=COMPRESSED_CACHE_MAXSIZE)
+_cache_lock = threading.Lock()
+
+
+def choose_encoding(accept_encodings, size: int) -> Optional[str]:
+    """
+    根据请求的Accept-Encoding选择压缩编码
+    
+    Args:
+        accept_encodings: werkzeug解析后的Accept-Encoding
+        size: 未压缩的响应大小
+    
+    Returns:
+        Optional[str]: 选中的编码，不压缩时为None
+    """
+    if size < COMPRESS_MIN_SIZE:
+        return None
+    for encoding in SUPPORTED_ENCODINGS:
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, etag: str, encoding: str) -> bytes:
+    """
+    获取响应的压缩字节，同一内容只压缩一次
+    
+    Args:
+        body: 未压缩的响应字节
+        etag: 响应内容的ETag
+        encoding: 压缩编码（br或gzip）
+    
+    Returns:
+        bytes: 压缩后的字节
+    """
+    cache_key = (etag, encoding)
+    with _cache_lock:
+        compressed = _compressed_cache.get(cache_key)
+    if compressed is not None:
+        return compressed
+    
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    
+    with _cache_lock:
+        _compressed_cache[cache_key] = compressed
+    return compressed
@@ -3,12 +3,14 @@ API路由定义
 定义所有的API端点和路由处理函数
 """
 import logging
-from typing import Dict, Any
-from datetime import datetime
-from flask import Blueprint, request, jsonify
-from pydantic import ValidationError
+import msgspec
+from typing import Dict, Any, Optional, Tuple
+from flask import Blueprint, request, jsonify, current_app, g
+from utils.request_utils import now_iso
 from .schemas import SignalQueryRequest, SignalQueryResponse, ErrorResponse, HealthCheckResponse
 from .services import signal_service
+from .serialization import dumps, compute_etag
+from .compression import choose_encoding, compress
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,162 @@ logger = logging.getLogger(__name__)
 api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
 
 
+# 静态内容（币种列表、API文档）允许客户端缓存的秒数
+STATIC_MAX_AGE = 3600
+
+# 支持的币种和时间周期在进程生命周期内不变，启动时预先序列化
+_SYMBOLS_BYTES = dumps({
+    'success': True,
+    'message': '获取支持的币种列表成功',
+    'data': {
+        'symbols': signal_service.supported_symbols,
+        'timeframes': signal_service.supported_timeframes,
+        'total_symbols': len(signal_service.supported_symbols),
+        'total_timeframes': len(signal_service.supported_timeframes)
+    }
+})
+_SYMBOLS_ETAG = compute_etag(_SYMBOLS_BYTES)
+
+# API使用文档
+_API_DOCS = {
+    'api_version': 'v1',
+    'title': '加密货币技术信号查询API',
+    'description': '提供加密货币技术分析信号的查询服务',
+    'endpoints': {
+        'health_check': {
+            'method': 'GET',
+            'path': '/api/v1/health',
+            'description': '检查API服务健康状态',
+            'response': 'HealthCheckResponse'
+        },
+        'query_signals_post': {
+            'method': 'POST',
+            'path': '/api/v1/signals',
+            'description': '查询指定币种的技术信号（POST方式）',
+            'request_body': {
+                'symbol': 'str (必填) - 币种符号，如BTC、ETH',
+                'timeframes': 'List[str] (可选) - 时间周期列表，如["5m", "15m", "1h", "1d"]'
+            },
+            'response': 'SignalQueryResponse'
+        },
+        'query_signals_get': {
+            'method': 'GET',
+            'path': '/api/v1/signals/<symbol>',
+            'description': '查询指定币种的技术信号（GET方式）',
+            'parameters': {
+                'symbol': 'str (路径参数) - 币种符号',
+                'timeframes': 'str (查询参数) - 逗号分隔的时间周期，如"5m,15m,1h"'
+            },
+            'response': 'SignalQueryResponse'
+        },
+        'supported_symbols': {
+            'method': 'GET',
+            'path': '/api/v1/symbols',
+            'description': '获取支持的币种和时间周期列表',
+            'response': 'SupportedDataResponse'
+        }
+    },
+    'supported_symbols': signal_service.supported_symbols,
+    'supported_timeframes': signal_service.supported_timeframes,
+    'example_requests': {
+        'post_example': {
+            'url': '/api/v1/signals',
+            'method': 'POST',
+            'headers': {'Content-Type': 'application/json'},
+            'body': {
+                'symbol': 'BTC',
+                'timeframes': ['5m', '1h']
+            }
+        },
+        'get_example': {
+            'url': '/api/v1/signals/BTC?timeframes=5m,1h',
+            'method': 'GET'
+        }
+    }
+}
+_DOCS_BYTES = dumps(_API_DOCS)
+_DOCS_ETAG = compute_etag(_DOCS_BYTES)
+
+
+def _error_template(message: str, error_code: str, detail_key: str) -> Tuple[bytes, bytes]:
+    """
+    预先序列化错误响应，只留出 details[detail_key] 的位置
+    
+    Args:
+        message: 错误消息
+        error_code: 错误代码
+        detail_key: 详情字段名
+        
+    Returns:
+        Tuple[bytes, bytes]: (详情值之前的JSON字节, 详情值之后的JSON字节)
+    """
+    head, tail = dumps({
+        'success': False,
+        'message': message,
+        'error_code': error_code,
+        'details': {detail_key: None}
+    }).rsplit(b'null', 1)
+    return head, tail
+
+
+# 预先序列化的错误响应
+_ERR_EMPTY_BODY_BYTES = dumps({
+    'success': False,
+    'message': '请求体不能为空',
+    'error_code': 'INVALID_REQUEST_BODY',
+    'details': {'received': 'empty'}
+})
+_ERR_INVALID_BODY_TMPL = _error_template('请求体不是有效的JSON', 'INVALID_REQUEST_BODY', 'error')
+_ERR_VALIDATION_TMPL = _error_template('请求参数验证失败', 'VALIDATION_ERROR', 'errors')
+_ERR_INTERNAL_TMPL = _error_template('服务器内部错误', 'INTERNAL_SERVER_ERROR', 'error')
+
+
+def _error_response(body: bytes, status: int):
+    """使用已序列化的错误JSON字节构建响应"""
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+def _render_error(template: Tuple[bytes, bytes], detail: Any, status: int):
+    """将详情值填入预先序列化的错误响应"""
+    head, tail = template
+    return _error_response(head + dumps(detail) + tail, status)
+
+
+def _json_bytes_response(body: bytes, etag: str, max_age: Optional[int] = None):
+    """
+    使用已序列化的JSON字节构建响应，客户端支持时返回压缩内容，ETag匹配时返回304
+    
+    Args:
+        body: JSON字节
+        etag: 响应内容的ETag
+        max_age: 允许客户端/CDN缓存的秒数，为空则不设置Cache-Control
+        
+    Returns:
+        Response: Flask响应对象
+    """
+    # 按Accept-Encoding压缩，不同编码的响应使用不同的ETag
+    encoding = choose_encoding(request.accept_encodings, len(body))
+    response_etag = f"{etag}-{encoding}" if encoding else etag
+    
+    if request.if_none_match.contains(response_etag):
+        response = current_app.response_class(status=304)
+    else:
+        if encoding:
+            body = compress(body, etag, encoding)
+        
+        response = current_app.response_class(body, mimetype='application/json')
+        
+        if encoding:
+            response.content_encoding = encoding
+    
+    response.set_etag(response_etag)
+    response.vary.add('Accept-Encoding')
+    if max_age is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """
@@ -29,10 +187,10 @@ def health_check():
         return jsonify(health_info), 200
         
     except Exception as e:
-        logger.error(f"健康检查失败: {e}")
+        logger.error("健康检查失败: %s", e)
         error_response = {
             'status': 'unhealthy',
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': now_iso(),
             'error': str(e)
         }
         return jsonify(error_response), 500
@@ -52,62 +210,27 @@ def query_signals():
     Returns:
         JSON: 技术信号查询结果
     """
+    # 解析并验证请求数据：msgspec直接从原始请求体解码，不缓存请求体
+    raw_body = request.get_data(cache=False) if request.mimetype == 'application/json' else None
+    if not raw_body:
+        return _error_response(_ERR_EMPTY_BODY_BYTES, 400)
+    
     try:
-        # 解析请求数据
-        request_data = request.get_json()
-        if not request_data:
-            return jsonify({
-                'success': False,
-                'message': '请求体不能为空',
-                'error_code': 'INVALID_REQUEST_BODY',
-                'details': {'received': 'empty'}
-            }), 400
-        
-        # 验证请求数据
-        try:
-            query_request = SignalQueryRequest(**request_data)
-        except ValidationError as e:
-            return jsonify({
-                'success': False,
-                'message': '请求参数验证失败',
-                'error_code': 'VALIDATION_ERROR',
-                'details': {'errors': e.errors()}
-            }), 400
-        
-        # 调用服务查询信号
-        signal_data = signal_service.get_recent_signals(
-            symbol=query_request.symbol,
-            timeframes=query_request.timeframes
-        )
-        
-        # 构建响应
-        response = {
-            'success': True,
-            'message': '查询成功',
-            'data': signal_data
-        }
-        
-        return jsonify(response), 200
-        
-    except ValueError as e:
-        # 业务逻辑错误（如不支持的币种）
-        logger.warning(f"查询参数错误: {e}")
-        return jsonify({
-            'success': False,
-            'message': str(e),
-            'error_code': 'INVALID_PARAMETER',
-            'details': {'symbol': request_data.get('symbol') if request_data else None}
-        }), 400
-        
-    except Exception as e:
-        # 服务器内部错误
-        logger.error(f"查询技术信号时发生错误: {e}")
-        return jsonify({
-            'success': False,
-            'message': '服务器内部错误',
-            'error_code': 'INTERNAL_SERVER_ERROR',
-            'details': {'error': str(e)}
-        }), 500
+        query_request = msgspec.json.decode(raw_body, type=SignalQueryRequest)
+    except msgspec.ValidationError:
+        # 验证失败由 handle_validation_error 统一处理
+        raise
+    except msgspec.DecodeError as e:
+        return _render_error(_ERR_INVALID_BODY_TMPL, str(e), 400)
+    g.symbol = query_request.symbol
+    
+    # 调用服务查询信号（带缓存）
+    body, etag = signal_service.get_cached_signals_response(
+        symbol=query_request.symbol,
+        timeframes=query_request.timeframes
+    )
+    
+    return _json_bytes_response(body, etag)
 
 
 @api_bp.route('/signals/<symbol>', methods=['GET'])
@@ -124,58 +247,22 @@ def query_signals_by_symbol(symbol: str):
     Returns:
         JSON: 技术信号查询结果
     """
-    try:
-        # 获取查询参数
-        timeframes_param = request.args.get('timeframes')
-        timeframes = None
-        if timeframes_param:
-            timeframes = [tf.strip() for tf in timeframes_param.split(',') if tf.strip()]
-        
-        # 验证请求数据
-        try:
-            query_request = SignalQueryRequest(symbol=symbol, timeframes=timeframes)
-        except ValidationError as e:
-            return jsonify({
-                'success': False,
-                'message': '请求参数验证失败',
-                'error_code': 'VALIDATION_ERROR',
-                'details': {'errors': e.errors()}
-            }), 400
-        
-        # 调用服务查询信号
-        signal_data = signal_service.get_recent_signals(
-            symbol=query_request.symbol,
-            timeframes=query_request.timeframes
-        )
-        
-        # 构建响应
-        response = {
-            'success': True,
-            'message': '查询成功',
-            'data': signal_data
-        }
-        
-        return jsonify(response), 200
-        
-    except ValueError as e:
-        # 业务逻辑错误
-        logger.warning(f"查询参数错误: {e}")
-        return jsonify({
-            'success': False,
-            'message': str(e),
-            'error_code': 'INVALID_PARAMETER',
-            'details': {'symbol': symbol, 'timeframes': timeframes_param}
-        }), 400
-        
-    except Exception as e:
-        # 服务器内部错误
-        logger.error(f"查询技术信号时发生错误: {e}")
-        return jsonify({
-            'success': False,
-            'message': '服务器内部错误',
-            'error_code': 'INTERNAL_SERVER_ERROR',
-            'details': {'error': str(e)}
-        }), 500
+    # 获取查询参数
+    timeframes_param = request.args.get('timeframes')
+    timeframes = None
+    if timeframes_param:
+        timeframes = [tf.strip() for tf in timeframes_param.split(',') if tf.strip()]
+    
+    # 验证请求数据，验证失败由 handle_validation_error 统一处理
+    query_request = msgspec.convert({'symbol': symbol, 'timeframes': timeframes}, SignalQueryRequest)
+    
+    # 调用服务查询信号（带缓存）
+    body, etag = signal_service.get_cached_signals_response(
+        symbol=query_request.symbol,
+        timeframes=query_request.timeframes
+    )
+    
+    return _json_bytes_response(body, etag)
 
 
 @api_bp.route('/symbols', methods=['GET'])
@@ -186,27 +273,7 @@ def get_supported_symbols():
     Returns:
         JSON: 支持的币种列表
     """
-    try:
-        response = {
-            'success': True,
-            'message': '获取支持的币种列表成功',
-            'data': {
-                'symbols': signal_service.supported_symbols,
-                'timeframes': signal_service.supported_timeframes,
-                'total_symbols': len(signal_service.supported_symbols),
-                'total_timeframes': len(signal_service.supported_timeframes)
-            }
-        }
-        return jsonify(response), 200
-        
-    except Exception as e:
-        logger.error(f"获取支持币种列表失败: {e}")
-        return jsonify({
-            'success': False,
-            'message': '获取支持币种列表失败',
-            'error_code': 'INTERNAL_SERVER_ERROR',
-            'details': {'error': str(e)}
-        }), 500
+    return _json_bytes_response(_SYMBOLS_BYTES, _SYMBOLS_ETAG, max_age=STATIC_MAX_AGE)
 
 
 @api_bp.route('/docs', methods=['GET'])
@@ -217,67 +284,29 @@ def api_documentation():
     Returns:
         JSON: API使用文档
     """
-    docs = {
-        'api_version': 'v1',
-        'title': '加密货币技术信号查询API',
-        'description': '提供加密货币技术分析信号的查询服务',
-        'endpoints': {
-            'health_check': {
-                'method': 'GET',
-                'path': '/api/v1/health',
-                'description': '检查API服务健康状态',
-                'response': 'HealthCheckResponse'
-            },
-            'query_signals_post': {
-                'method': 'POST',
-                'path': '/api/v1/signals',
-                'description': '查询指定币种的技术信号（POST方式）',
-                'request_body': {
-                    'symbol': 'str (必填) - 币种符号，如BTC、ETH',
-                    'timeframes': 'List[str] (可选) - 时间周期列表，如["5m", "15m", "1h", "1d"]'
-                },
-                'response': 'SignalQueryResponse'
-            },
-            'query_signals_get': {
-                'method': 'GET',
-                'path': '/api/v1/signals/<symbol>',
-                'description': '查询指定币种的技术信号（GET方式）',
-                'parameters': {
-                    'symbol': 'str (路径参数) - 币种符号',
-                    'timeframes': 'str (查询参数) - 逗号分隔的时间周期，如"5m,15m,1h"'
-                },
-                'response': 'SignalQueryResponse'
-            },
-            'supported_symbols': {
-                'method': 'GET',
-                'path': '/api/v1/symbols',
-                'description': '获取支持的币种和时间周期列表',
-                'response': 'SupportedDataResponse'
-            }
-        },
-        'supported_symbols': signal_service.supported_symbols,
-        'supported_timeframes': signal_service.supported_timeframes,
-        'example_requests': {
-            'post_example': {
-                'url': '/api/v1/signals',
-                'method': 'POST',
-                'headers': {'Content-Type': 'application/json'},
-                'body': {
-                    'symbol': 'BTC',
-                    'timeframes': ['5m', '1h']
-                }
-            },
-            'get_example': {
-                'url': '/api/v1/signals/BTC?timeframes=5m,1h',
-                'method': 'GET'
-            }
-        }
-    }
-    
-    return jsonify(docs), 200
+    return _json_bytes_response(_DOCS_BYTES, _DOCS_ETAG, max_age=STATIC_MAX_AGE)
 
 
 # 错误处理器
+@api_bp.errorhandler(msgspec.ValidationError)
+def handle_validation_error(error: msgspec.ValidationError):
+    """处理请求参数验证失败"""
+    return _render_error(_ERR_VALIDATION_TMPL, [{'msg': str(error)}], 400)
+
+
+@api_bp.errorhandler(ValueError)
+def handle_value_error(error: ValueError):
+    """处理业务逻辑错误（如不支持的币种）"""
+    logger.warning("查询参数错误: %s", error)
+    symbol = g.get('symbol') or (request.view_args or {}).get('symbol')
+    return _error_response(dumps({
+        'success': False,
+        'message': str(error),
+        'error_code': 'INVALID_PARAMETER',
+        'details': {'symbol': symbol, 'timeframes': request.args.get('timeframes')}
+    }), 400)
+
+
 @api_bp.errorhandler(404)
 def not_found_error(error):
     """处理404错误"""
@@ -303,9 +332,4 @@ def method_not_allowed_error(error):
 @api_bp.errorhandler(500)
 def internal_error(error):
     """处理500错误"""
-    return jsonify({
-        'success': False,
-        'message': '服务器内部错误',
-        'error_code': 'INTERNAL_SERVER_ERROR',
-        'details': {'error': str(error)}
-    }), 500 
\ No newline at end of file
+    return _render_error(_ERR_INTERNAL_TMPL, str(error), 500)
@@ -2,37 +2,38 @@
 API Schema定义
 包含请求和响应的数据结构定义
 """
-from typing import List, Dict, Optional, Any
+import sys
+from typing import Annotated, List, Dict, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+import msgspec
+from pydantic import BaseModel, Field
+from config.settings import TIMEFRAMES, SUPPORTED_TIMEFRAMES_SET
 
 
-class SignalQueryRequest(BaseModel):
-    """技术信号查询请求Schema"""
-    symbol: str = Field(..., description="币种符号，如BTC或ETH", example="BTC")
-    timeframes: Optional[List[str]] = Field(
-        default=None, 
-        description="时间周期列表，不指定则查询所有周期", 
-        example=["5m", "15m", "1h", "1d"]
-    )
+class SignalQueryRequest(msgspec.Struct):
+    """
+    技术信号查询请求Schema
     
-    @validator('symbol')
-    def validate_symbol(cls, v):
-        """验证币种符号"""
-        if not v:
-            raise ValueError('币种符号不能为空')
-        # 转换为大写
-        return v.upper()
+    使用msgspec在解码JSON的同时完成类型校验，业务校验在 __post_init__ 中进行，
+    校验失败时统一抛出 msgspec.ValidationError。
+    """
+    symbol: Annotated[str, msgspec.Meta(description="币种符号，如BTC或ETH", examples=["BTC"])]
+    timeframes: Annotated[
+        Optional[List[str]],
+        msgspec.Meta(description="时间周期列表，不指定则查询所有周期", examples=[["5m", "15m", "1h", "1d"]])
+    ] = None
     
-    @validator('timeframes')
-    def validate_timeframes(cls, v):
-        """验证时间周期"""
-        if v is not None:
-            valid_timeframes = ['5m', '15m', '1h', '1d']
-            for tf in v:
-                if tf not in valid_timeframes:
-                    raise ValueError(f'无效的时间周期: {tf}，支持的周期: {valid_timeframes}')
-        return v
+    def __post_init__(self):
+        """验证币种符号与时间周期"""
+        if not self.symbol:
+            raise ValueError('币种符号不能为空')
+        # 转换为大写并驻留，与配置中的币种共用同一字符串对象
+        self.symbol = sys.intern(self.symbol.upper())
+        
+        if self.timeframes is not None:
+            invalid = [tf for tf in self.timeframes if tf not in SUPPORTED_TIMEFRAMES_SET]
+            if invalid:
+                raise ValueError(f'无效的时间周期: {invalid[0]}，支持的周期: {TIMEFRAMES}')
 
 
 class TechnicalSignalData(BaseModel):
@@ -45,11 +46,6 @@ class TechnicalSignalData(BaseModel):
     close: float = Field(..., description="收盘价")
     volume: float = Field(..., description="成交量")
     signals: List[str] = Field(default_factory=list, description="技术信号列表")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class TimeframeSignals(BaseModel):
@@ -70,11 +66,6 @@ class SignalQueryResponse(BaseModel):
         query_time: datetime = Field(..., description="查询时间")
         timeframes: List[TimeframeSignals] = Field(..., description="各时间周期的信号数据")
         summary: Dict[str, Any] = Field(..., description="信号汇总统计")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class ErrorResponse(BaseModel):
@@ -92,8 +83,4 @@ class HealthCheckResponse(BaseModel):
     database: Dict[str, Any] = Field(..., description="数据库状态")
     supported_symbols: List[str] = Field(..., description="支持的币种列表")
     supported_timeframes: List[str] = Field(..., description="支持的时间周期列表")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        } 
\ No newline at end of file
+ 
\ No newline at end of file
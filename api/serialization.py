@@ -0,0 +1,77 @@
+"""
+JSON序列化工具
+统一API响应使用的orjson序列化选项
+"""
+import hashlib
+import time
+from typing import Any, List
+import orjson
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+# orjson序列化选项：支持非字符串键、numpy数组；时间交给Flask的default处理，
+# 与Flask默认JSON一致输出为RFC 822格式的HTTP日期字符串
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(obj) -> bytes:
+    """
+    将对象序列化为JSON字节
+    
+    Args:
+        obj: 待序列化的对象
+        
+    Returns:
+        bytes: JSON字节
+    """
+    return orjson.dumps(obj, default=DefaultJSONProvider.default, option=ORJSON_OPTIONS)
+
+
+# 按秒缓存的HTTP日期字符串：[秒级时间戳, 格式化结果]
+_HTTP_DATE_CACHE: List[Any] = [0, ""]
+
+
+def now_http_date() -> str:
+    """
+    获取当前时间的HTTP日期字符串（秒级缓存）
+    
+    与Flask序列化datetime的格式一致，响应中的时间字段统一为同一格式。
+    
+    Returns:
+        str: 如 Mon, 01 Jan 2024 00:00:00 GMT
+    """
+    now = int(time.time())
+    if now != _HTTP_DATE_CACHE[0]:
+        _HTTP_DATE_CACHE[1] = http_date(now)
+        _HTTP_DATE_CACHE[0] = now
+    return _HTTP_DATE_CACHE[1]
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    计算响应内容的ETag
+    
+    Args:
+        body: 响应字节
+        
+    Returns:
+        str: 16位十六进制摘要
+    """
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """基于orjson的JSON序列化，替代Flask默认的标准库json"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        """序列化为JSON字符串"""
+        return dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        """反序列化JSON"""
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """构建JSON响应，直接使用orjson输出的字节"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
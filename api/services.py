@@ -3,13 +3,38 @@ API业务逻辑服务层
 处理技术信号查询的核心业务逻辑
 """
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import threading
+from collections import Counter
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from cachetools import TTLCache
 from database.mongo_client import mongodb_client
-from config.settings import TIMEFRAMES, SYMBOL_MAPPING
+from config.settings import TIMEFRAMES, SUPPORTED_SYMBOLS, SUPPORTED_TIMEFRAMES_SET
+from .serialization import dumps, compute_etag, now_http_date
 
 logger = logging.getLogger(__name__)
 
+# 信号查询返回的K线字段
+RECENT_PERIOD_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'signals')
+
+# 信号查询只需要的K线字段，避免解码整条文档
+# 没有信号的K线由数据库补成空列表，查询结果无需再做缺省处理
+RECENT_PERIOD_PROJECTION = {
+    '_id': 0,
+    **{field: 1 for field in RECENT_PERIOD_FIELDS},
+    'signals': {'$ifNull': ['$signals', []]}
+}
+
+# 汇总统计中返回的热门信号数量
+POPULAR_SIGNALS_LIMIT = 10
+
+# 信号总数达到该值时改用numpy统计，数量少时numpy的调用开销反而更大
+NUMPY_SUMMARY_MIN_SIGNALS = 64
+
+# 信号查询响应缓存：数据每分钟采集一次，缓存30秒
+SIGNAL_CACHE_MAXSIZE = 1024
+SIGNAL_CACHE_TTL = 30
+
 
 class SignalService:
     """技术信号查询服务"""
@@ -17,10 +42,83 @@ class SignalService:
     def __init__(self):
         """初始化服务"""
         self.db_client = mongodb_client
-        self.supported_symbols = list(SYMBOL_MAPPING.values())
+        self.supported_symbols = sorted(SUPPORTED_SYMBOLS)
+        self.supported_symbols_set = SUPPORTED_SYMBOLS
         self.supported_timeframes = TIMEFRAMES
+        self.supported_timeframes_set = SUPPORTED_TIMEFRAMES_SET
+        
+        # (币种, 时间周期) -> (序列化后的响应, ETag)
+        self._response_cache: TTLCache = TTLCache(maxsize=SIGNAL_CACHE_MAXSIZE, ttl=SIGNAL_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+    
+    def get_cached_signals_response(self, symbol: str, timeframes: Optional[Sequence[str]] = None) -> Tuple[bytes, str]:
+        """
+        获取技术信号查询成功响应的JSON字节及ETag，结果在TTL内缓存
+        
+        缓存的是整个响应，TTL内返回的query_time是生成该响应的时间，而不是本次请求的时间；
+        查询失败时异常向上抛出，不会缓存。
+        
+        Args:
+            symbol: 币种符号 (如BTC, ETH)
+            timeframes: 时间周期列表，None表示查询所有周期
+            
+        Returns:
+            Tuple[bytes, str]: (响应JSON字节, ETag)
+        """
+        # 时间周期规范化后作为缓存键，顺序不同或重复的请求命中同一缓存
+        timeframes = self.normalize_timeframes(timeframes)
+        cache_key = (symbol, timeframes)
+        
+        with self._cache_lock:
+            cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        body = self.get_recent_signals_bytes(symbol=symbol, timeframes=timeframes)
+        cached = (body, compute_etag(body))
+        
+        with self._cache_lock:
+            self._response_cache[cache_key] = cached
+        return cached
+    
+    def get_recent_signals_bytes(self, symbol: str, timeframes: Optional[Sequence[str]] = None) -> bytes:
+        """
+        获取技术信号查询成功响应的JSON字节（供HTTP接口直接返回）
+        
+        Args:
+            symbol: 币种符号 (如BTC, ETH)
+            timeframes: 时间周期列表，None表示查询所有周期
+            
+        Returns:
+            bytes: 响应JSON字节
+        """
+        return dumps({
+            'success': True,
+            'message': '查询成功',
+            'data': self.get_recent_signals(symbol=symbol, timeframes=timeframes)
+        })
+    
+    def normalize_timeframes(self, timeframes: Optional[Sequence[str]] = None) -> Tuple[str, ...]:
+        """
+        校验并规范化时间周期：去重，并按配置中声明的顺序排列
+        
+        Args:
+            timeframes: 时间周期列表，为空表示所有周期
+            
+        Returns:
+            Tuple[str, ...]: 规范化后的时间周期
+        """
+        if not timeframes:
+            return tuple(self.supported_timeframes)
+        
+        requested = set(timeframes)
+        for tf in requested:
+            if tf not in self.supported_timeframes_set:
+                raise ValueError(f"不支持的时间周期: {tf}，支持的周期: {self.supported_timeframes}")
+        
+        return tuple(tf for tf in self.supported_timeframes if tf in requested)
     
-    def get_recent_signals(self, symbol: str, timeframes: Optional[List[str]] = None) -> Dict[str, Any]:
+    def get_recent_signals(self, symbol: str, timeframes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
         """
         获取指定币种最近两个交易时段的技术信号
         
@@ -33,21 +131,17 @@ class SignalService:
         """
         try:
             # 验证币种
-            if symbol not in self.supported_symbols:
+            if symbol not in self.supported_symbols_set:
                 raise ValueError(f"不支持的币种: {symbol}，支持的币种: {self.supported_symbols}")
             
-            # 验证时间周期
-            if timeframes is None:
-                timeframes = self.supported_timeframes
-            else:
-                for tf in timeframes:
-                    if tf not in self.supported_timeframes:
-                        raise ValueError(f"不支持的时间周期: {tf}，支持的周期: {self.supported_timeframes}")
+            # 验证并规范化时间周期
+            timeframes = self.normalize_timeframes(timeframes)
             
-            # 查询各时间周期的信号数据
+            # 一次查询获取所有时间周期的信号数据
+            recent_data_by_timeframe = self._get_recent_data(symbol, timeframes)
             timeframe_results = []
             for timeframe in timeframes:
-                recent_data = self._get_recent_data_for_timeframe(symbol, timeframe)
+                recent_data = recent_data_by_timeframe.get(timeframe)
                 if recent_data:
                     timeframe_results.append({
                         'timeframe': timeframe,
@@ -59,66 +153,82 @@ class SignalService:
             
             result = {
                 'symbol': symbol,
-                'query_time': datetime.utcnow(),
+                'query_time': now_http_date(),
                 'timeframes': timeframe_results,
                 'summary': summary
             }
             
-            logger.info(f"成功查询技术信号: {symbol}, 时间周期: {timeframes}")
+            logger.info("成功查询技术信号: %s, 时间周期: %s", symbol, timeframes)
             return result
             
         except Exception as e:
-            logger.error(f"查询技术信号失败: {e}")
+            logger.error("查询技术信号失败: %s", e)
             raise
     
-    def _get_recent_data_for_timeframe(self, symbol: str, timeframe: str) -> List[Dict[str, Any]]:
+    def _get_recent_data(self, symbol: str, timeframes: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
         """
-        获取指定时间周期的最近两个时段数据
+        通过一次聚合查询获取多个时间周期的最近两个时段数据
+        
+        每个时间周期使用独立的子管道（按索引取最新两条），再用$unionWith合并，
+        避免对全部历史数据分组。
         
         Args:
             symbol: 币种符号
-            timeframe: 时间周期
+            timeframes: 时间周期列表
             
         Returns:
-            List[Dict]: 最近两个时段的数据列表
+            Dict[str, List[Dict]]: 时间周期 -> 最近两个时段的数据列表（按时间正序）
         """
+        if not timeframes:
+            return {}
+        
         try:
-            # 查询最近两个时段的数据
-            query = {
-                'symbol': symbol,
-                'timeframe': timeframe
-            }
+            collection = self.db_client.read_collection
             
-            cursor = self.db_client.collection.find(query).sort('timestamp', -1).limit(2)
-            raw_data = list(cursor)
-            
-            if not raw_data:
-                logger.warning(f"未找到数据: {symbol} {timeframe}")
-                return []
-            
-            # 按时间正序排列（最老的在前）
-            raw_data.reverse()
-            
-            # 格式化数据
-            formatted_data = []
-            for item in raw_data:
-                formatted_item = {
-                    'timestamp': item.get('timestamp'),
-                    'timeframe': timeframe,
-                    'open': float(item.get('open', 0)),
-                    'high': float(item.get('high', 0)),
-                    'low': float(item.get('low', 0)),
-                    'close': float(item.get('close', 0)),
-                    'volume': float(item.get('volume', 0)),
-                    'signals': item.get('signals', [])
-                }
-                formatted_data.append(formatted_item)
+            def recent_periods_stages(timeframe: str) -> List[Dict[str, Any]]:
+                return [
+                    {'$match': {'symbol': symbol, 'timeframe': timeframe}},
+                    {'$sort': {'timestamp': -1}},
+                    {'$limit': 2},
+                    {'$project': {**RECENT_PERIOD_PROJECTION, 'timeframe': 1}}
+                ]
+            
+            pipeline = recent_periods_stages(timeframes[0])
+            for timeframe in timeframes[1:]:
+                pipeline.append({
+                    '$unionWith': {
+                        'coll': collection.name,
+                        'pipeline': recent_periods_stages(timeframe)
+                    }
+                })
+            
+            # 各周期的数据按时间倒序返回
+            raw_data_by_timeframe: Dict[str, List[Dict[str, Any]]] = {}
+            for item in collection.aggregate(pipeline, allowDiskUse=False):
+                raw_data_by_timeframe.setdefault(item['timeframe'], []).append(item)
+            
+            result = {}
+            for timeframe in timeframes:
+                raw_data = raw_data_by_timeframe.get(timeframe)
+                if not raw_data:
+                    logger.warning("未找到数据: %s %s", symbol, timeframe)
+                    continue
+                
+                # 按时间正序排列（最老的在前）
+                raw_data.reverse()
+                
+                # 格式化数据（价格字段在入库时已转换为float）
+                result[timeframe] = [
+                    {'timeframe': timeframe, **{field: item.get(field) for field in RECENT_PERIOD_FIELDS}}
+                    for item in raw_data
+                ]
             
-            return formatted_data
+            return result
             
         except Exception as e:
-            logger.error(f"获取时间周期数据失败: {symbol} {timeframe}, 错误: {e}")
-            return []
+            # 向上抛出：返回空结果会被当作成功响应缓存到TTL结束
+            logger.error("获取时间周期数据失败: %s %s, 错误: %s", symbol, timeframes, e)
+            raise
     
     def _generate_summary(self, timeframe_results: List[Dict]) -> Dict[str, Any]:
         """
@@ -131,9 +241,8 @@ class SignalService:
             Dict: 汇总统计数据
         """
         try:
-            all_signals = []
+            all_signals: List[str] = []
             total_periods = 0
-            signal_counts = {}
             timeframe_summary = {}
             
             for tf_result in timeframe_results:
@@ -141,41 +250,41 @@ class SignalService:
                 periods_data = tf_result['recent_periods']
                 
                 # 统计这个时间周期的信号
-                tf_signals = []
-                for period in periods_data:
-                    period_signals = period.get('signals', [])
-                    tf_signals.extend(period_signals)
-                    all_signals.extend(period_signals)
-                    total_periods += 1
+                tf_signals = [
+                    signal
+                    for period in periods_data
+                    for signal in (period.get('signals') or ())
+                ]
+                total_periods += len(periods_data)
+                all_signals.extend(tf_signals)
                 
                 # 时间周期汇总
                 timeframe_summary[timeframe] = {
                     'periods_count': len(periods_data),
                     'signals_count': len(tf_signals),
-                    'unique_signals': list(set(tf_signals))
+                    'unique_signals': list(dict.fromkeys(tf_signals))
                 }
             
-            # 统计信号出现次数
-            for signal in all_signals:
-                signal_counts[signal] = signal_counts.get(signal, 0) + 1
-            
-            # 计算热门信号（按出现频率排序）
-            popular_signals = sorted(signal_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            signal_frequency, popular_signals = self._count_signals(all_signals)
+            total_signals = len(all_signals)
             
             summary = {
                 'total_periods': total_periods,
-                'total_signals': len(all_signals),
-                'unique_signals_count': len(set(all_signals)),
+                'total_signals': total_signals,
+                'unique_signals_count': len(signal_frequency),
                 'timeframe_summary': timeframe_summary,
-                'signal_frequency': dict(signal_counts),
-                'popular_signals': [{'signal': signal, 'count': count} for signal, count in popular_signals],
-                'has_signals': len(all_signals) > 0
+                'signal_frequency': signal_frequency,
+                'popular_signals': [
+                    {'signal': signal, 'count': count}
+                    for signal, count in popular_signals
+                ],
+                'has_signals': total_signals > 0
             }
             
             return summary
             
         except Exception as e:
-            logger.error(f"生成汇总统计失败: {e}")
+            logger.error("生成汇总统计失败: %s", e)
             return {
                 'total_periods': 0,
                 'total_signals': 0,
@@ -184,6 +293,28 @@ class SignalService:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _count_signals(signals: List[str]) -> Tuple[Dict[str, int], List[Tuple[str, int]]]:
+        """
+        统计信号出现次数
+        
+        信号数量较少时使用Counter，数量较多时（周期数增加后）使用numpy向量化统计。
+        
+        Args:
+            signals: 所有信号名称
+            
+        Returns:
+            Tuple: (信号 -> 次数, 出现次数最多的前10个信号)
+        """
+        if len(signals) < NUMPY_SUMMARY_MIN_SIGNALS:
+            counts = Counter(signals)
+            return dict(counts), counts.most_common(POPULAR_SIGNALS_LIMIT)
+        
+        values, counts = np.unique(np.array(signals), return_counts=True)
+        top = np.argsort(-counts, kind='stable')[:POPULAR_SIGNALS_LIMIT]
+        popular = list(zip(values[top].tolist(), counts[top].tolist()))
+        return dict(zip(values.tolist(), counts.tolist())), popular
+    
     def check_health(self) -> Dict[str, Any]:
         """
         检查服务健康状态
@@ -213,7 +344,7 @@ class SignalService:
             
             health_info = {
                 'status': 'healthy' if db_status == 'connected' else 'unhealthy',
-                'timestamp': datetime.utcnow(),
+                'timestamp': now_http_date(),
                 'database': {
                     'status': db_status,
                     'info': db_info
@@ -225,10 +356,10 @@ class SignalService:
             return health_info
             
         except Exception as e:
-            logger.error(f"健康检查失败: {e}")
+            logger.error("健康检查失败: %s", e)
             return {
                 'status': 'unhealthy',
-                'timestamp': datetime.utcnow(),
+                'timestamp': now_http_date(),
                 'error': str(e)
             }
 
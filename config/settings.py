@@ -3,6 +3,7 @@
 包含数据库连接、API配置、技术指标参数等
 """
 import os
+import sys
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -16,6 +17,17 @@ MONGODB_CONFIG = {
     'collection': os.getenv('MONGODB_COLLECTION', 'klines'),
     'username': os.getenv('MONGODB_USERNAME'),
     'password': os.getenv('MONGODB_PASSWORD'),
+    'max_pool_size': int(os.getenv('MONGODB_MAX_POOL_SIZE', 100)),
+    'min_pool_size': int(os.getenv('MONGODB_MIN_POOL_SIZE', 8)),
+    # 默认不限制单次操作的socket等待时间：采集、批量计算与索引构建中的长时间操作不能被中断；
+    # API服务在gunicorn.conf.py中设置较短的超时
+    'socket_timeout_ms': (
+        int(os.environ['MONGODB_SOCKET_TIMEOUT_MS']) if os.getenv('MONGODB_SOCKET_TIMEOUT_MS') else None
+    ),
+    'server_selection_timeout_ms': int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+    # 网络传输压缩算法，按优先级排列，服务端不支持时自动不压缩
+    # zstd需要安装zstandard（pymongo[zstd]），未安装时驱动跳过zstd使用zlib
+    'compressors': os.getenv('MONGODB_COMPRESSORS', 'zstd,zlib'),
 }
 
 # CCXT 配置
@@ -33,8 +45,14 @@ SYMBOL_MAPPING = {
     'ETH/USDT': 'ETH'
 }
 
+# 支持查询的币种集合（驻留字符串，成员判断为O(1)）
+SUPPORTED_SYMBOLS = frozenset(sys.intern(v) for v in SYMBOL_MAPPING.values())
+
 # 时间周期配置
 TIMEFRAMES = ['5m', '15m', '1h', '1d']  # K线周期
+
+# 支持的时间周期集合，用于O(1)校验
+SUPPORTED_TIMEFRAMES_SET = frozenset(sys.intern(t) for t in TIMEFRAMES)
 HISTORICAL_LIMIT = 60  # 获取历史数据的条数
 
 # 技术指标参数
@@ -67,7 +85,7 @@ SIGNAL_THRESHOLDS = {
 
 # 日志配置
 LOGGING_CONFIG = {
-    'level': 'INFO',
+    'level': os.getenv('LOG_LEVEL', 'INFO').upper(),
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     'filename': 'logs/crypto_analysis.log',
     'max_bytes': 10 * 1024 * 1024,  # 10MB
@@ -2,25 +2,70 @@
 CCXT数据采集模块
 负责从加密货币交易所获取K线数据，支持增量更新
 """
+import asyncio
+import json
 import logging
+import os
+import random
+import time
 import ccxt
-from typing import Dict, List, Optional
+import ccxt.async_support as ccxt_async
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
-import time
 
 from config.settings import EXCHANGE_CONFIG, SYMBOLS, SYMBOL_MAPPING, TIMEFRAMES, HISTORICAL_LIMIT
 from database.mongo_client import mongodb_client
 
 logger = logging.getLogger(__name__)
 
+# 市场数据的本地缓存：新进程在有效期内直接读取，不再请求交易所
+MARKETS_CACHE_DIR = os.path.expanduser('~/.cache/ccxt')
+MARKETS_CACHE_TTL = 24 * 3600
+
+# 获取K线遇到限流或网络错误时的重试：最多尝试次数，以及指数退避的基数与上限（秒）
+FETCH_MAX_ATTEMPTS = 4
+FETCH_BACKOFF_BASE = 1.0
+FETCH_BACKOFF_MAX = 30.0
+
+
+def _retry_delay(attempt: int, symbol: str, timeframe: str, error: Exception) -> Optional[float]:
+    """
+    获取K线遇到可重试错误时的重试策略（异步与同步获取共用）：指数退避加随机抖动
+    
+    Args:
+        attempt: 本次尝试的序号（从0开始）
+        symbol: 交易对符号
+        timeframe: 时间周期
+        error: 本次尝试的异常
+        
+    Returns:
+        Optional[float]: 重试前等待的秒数，已达到最大尝试次数时为None
+    """
+    if attempt >= FETCH_MAX_ATTEMPTS - 1:
+        logger.error(f"获取K线数据失败 {symbol} {timeframe}, 已重试{attempt}次: {error}")
+        return None
+    delay = min(FETCH_BACKOFF_BASE * 2 ** attempt + random.random(), FETCH_BACKOFF_MAX)
+    logger.warning(f"获取K线数据失败 {symbol} {timeframe}: {type(error).__name__}, {delay:.1f}秒后重试")
+    return delay
+
 
 class CCXTDataCollector:
     """CCXT数据采集器"""
     
     def __init__(self):
         """初始化CCXT数据采集器"""
-        self.exchange = None
-        self.initialize_exchange()
+        # 交易所实例在首次使用时才初始化，导入模块时不发起网络请求
+        self._exchange = None
+        # (币种, 时间周期) -> 数据库中最新的K线时间，避免每次判断新旧数据都查询数据库
+        self._latest_ts: Dict[Tuple[str, str], datetime] = {}
+    
+    @property
+    def exchange(self) -> Optional[ccxt.Exchange]:
+        """交易所实例，首次访问时初始化，初始化失败时为None"""
+        if self._exchange is None:
+            self.initialize_exchange()
+        return self._exchange
     
     def initialize_exchange(self) -> bool:
         """
@@ -34,16 +79,14 @@ class CCXTDataCollector:
             exchange_class = getattr(ccxt, EXCHANGE_CONFIG['exchange'])
             
             # 创建交易所实例
-            self.exchange = exchange_class({
-                'rateLimit': EXCHANGE_CONFIG['rateLimit'],
-                'timeout': EXCHANGE_CONFIG['timeout'],
-                'sandbox': EXCHANGE_CONFIG['sandbox'],
-                'enableRateLimit': True,
-            })
+            exchange = exchange_class(self._exchange_options())
             
-            # 加载市场数据
-            self.exchange.load_markets()
+            # 加载市场数据，优先使用本地缓存
+            if not self._load_cached_markets(exchange):
+                exchange.load_markets()
+                self._save_cached_markets(exchange)
             
+            self._exchange = exchange
             logger.info(f"成功初始化交易所: {EXCHANGE_CONFIG['exchange']}")
             return True
             
@@ -51,35 +94,182 @@ class CCXTDataCollector:
             logger.error(f"初始化交易所失败: {e}")
             return False
     
-    def fetch_klines(self, symbol: str, timeframe: str, limit: int = None) -> Optional[List[List]]:
+    @staticmethod
+    def _markets_cache_path() -> str:
+        """市场数据缓存文件路径"""
+        return os.path.join(MARKETS_CACHE_DIR, f"markets_{EXCHANGE_CONFIG['exchange']}.json")
+    
+    def _load_cached_markets(self, exchange: ccxt.Exchange) -> bool:
+        """
+        从本地缓存加载市场数据
+        
+        Args:
+            exchange: 交易所实例
+            
+        Returns:
+            bool: 缓存存在且未过期并加载成功
+        """
+        path = self._markets_cache_path()
+        try:
+            if time.time() - os.path.getmtime(path) > MARKETS_CACHE_TTL:
+                return False
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            exchange.set_markets(cached['markets'], cached.get('currencies'))
+            logger.debug(f"使用本地缓存的市场数据: {path}")
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"读取市场数据缓存失败: {e}")
+            return False
+    
+    def _save_cached_markets(self, exchange: ccxt.Exchange):
+        """
+        将市场数据写入本地缓存（先写临时文件再替换，避免并发进程读到不完整的文件）
+        
+        Args:
+            exchange: 交易所实例
+        """
+        if not exchange.markets:
+            return
+        
+        path = self._markets_cache_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(MARKETS_CACHE_DIR, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'markets': exchange.markets, 'currencies': exchange.currencies}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"写入市场数据缓存失败: {e}")
+    
+    @staticmethod
+    def _exchange_options() -> Dict:
+        """交易所实例的连接参数"""
+        return {
+            'rateLimit': EXCHANGE_CONFIG['rateLimit'],
+            'timeout': EXCHANGE_CONFIG['timeout'],
+            'sandbox': EXCHANGE_CONFIG['sandbox'],
+            'enableRateLimit': True,
+        }
+    
+    @asynccontextmanager
+    async def _async_exchange(self) -> AsyncIterator[ccxt_async.Exchange]:
+        """
+        创建异步交易所实例，复用已加载的市场数据，退出时关闭连接
+        
+        异步实例的HTTP会话绑定在当前事件循环上，因此每次采集单独创建。
+        
+        Yields:
+            ccxt_async.Exchange: 异步交易所实例
+        """
+        exchange = getattr(ccxt_async, EXCHANGE_CONFIG['exchange'])(self._exchange_options())
+        try:
+            if self.exchange is not None and self.exchange.markets:
+                exchange.set_markets(self.exchange.markets, self.exchange.currencies)
+            yield exchange
+        finally:
+            await exchange.close()
+    
+    async def fetch_klines(self, exchange: ccxt_async.Exchange, symbol: str, timeframe: str,
+                           limit: int = None, since: int = None) -> Optional[List[List]]:
         """
         获取K线数据
         
         Args:
+            exchange: 异步交易所实例
             symbol: 交易对符号
             timeframe: 时间周期
             limit: 获取数量限制
+            since: 起始时间（毫秒时间戳），只返回该时间及之后的K线
             
         Returns:
             Optional[List[List]]: K线数据列表
         """
-        try:
-            if limit is None:
-                limit = HISTORICAL_LIMIT
-            
-            # 获取K线数据
-            ohlcv = self.exchange.fetch_ohlcv(
-                symbol=symbol,
-                timeframe=timeframe,
-                limit=limit
-            )
-            
-            logger.debug(f"成功获取K线数据: {symbol} {timeframe}, 数量: {len(ohlcv)}")
-            return ohlcv
+        if limit is None:
+            limit = HISTORICAL_LIMIT
+        
+        for attempt in range(FETCH_MAX_ATTEMPTS):
+            try:
+                # 获取K线数据
+                ohlcv = await exchange.fetch_ohlcv(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    since=since,
+                    limit=limit
+                )
+                
+                logger.debug(f"成功获取K线数据: {symbol} {timeframe}, 数量: {len(ohlcv)}")
+                return ohlcv
+                
+            except ccxt.NetworkError as e:
+                # 限流（RateLimitExceeded/DDoSProtection）、交易所不可用、超时等可重试的错误
+                delay = _retry_delay(attempt, symbol, timeframe, e)
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+                
+            except Exception as e:
+                logger.error(f"获取K线数据失败 {symbol} {timeframe}: {e}")
+                return None
+        
+        return None
+    
+    async def fetch_klines_multi(self, exchange: ccxt_async.Exchange, symbols: List[str], timeframe: str,
+                                 limit: int = None,
+                                 since: Optional[Dict[str, int]] = None) -> Dict[str, Optional[List[List]]]:
+        """
+        获取多个交易对同一时间周期的K线数据
+        
+        交易所支持 fetchOHLCVForSymbols 时，起始时间相同的交易对合并为一次请求，否则按交易对并发请求。
+        
+        Args:
+            exchange: 异步交易所实例
+            symbols: 交易对符号列表
+            timeframe: 时间周期
+            limit: 获取数量限制
+            since: 交易对 -> 起始时间（毫秒时间戳），未指定的交易对获取最新的K线
             
-        except Exception as e:
-            logger.error(f"获取K线数据失败 {symbol} {timeframe}: {e}")
-            return None
+        Returns:
+            Dict[str, Optional[List[List]]]: 交易对 -> K线数据列表（获取失败为None）
+        """
+        if exchange.has.get('fetchOHLCVForSymbols'):
+            try:
+                if limit is None:
+                    limit = HISTORICAL_LIMIT
+                
+                # 起始时间相同的交易对合并为一次请求，无历史数据的交易对（since为None）单独一组
+                groups: Dict[Optional[int], List[str]] = {}
+                for symbol in symbols:
+                    groups.setdefault(since.get(symbol) if since else None, []).append(symbol)
+                
+                # 返回结构: {交易对: {时间周期: K线数据}}
+                responses = await asyncio.gather(
+                    *(
+                        exchange.fetch_ohlcv_for_symbols(
+                            [[symbol, timeframe] for symbol in group_symbols],
+                            since=group_since,
+                            limit=limit
+                        )
+                        for group_since, group_symbols in groups.items()
+                    )
+                )
+                ohlcv_by_symbol = {}
+                for response in responses:
+                    ohlcv_by_symbol.update(response)
+                return {
+                    symbol: ohlcv_by_symbol.get(symbol, {}).get(timeframe)
+                    for symbol in symbols
+                }
+            except Exception as e:
+                logger.warning(f"批量获取K线数据失败，改为逐个交易对获取 {timeframe}: {e}")
+        
+        results = await asyncio.gather(
+            *(self.fetch_klines(exchange, symbol, timeframe, limit, since.get(symbol) if since else None)
+              for symbol in symbols)
+        )
+        return dict(zip(symbols, results))
     
     def process_kline_data(self, raw_data: List[List], symbol: str, timeframe: str) -> List[Dict]:
         """
@@ -93,26 +283,30 @@ class CCXTDataCollector:
         Returns:
             List[Dict]: 处理后的K线数据
         """
-        processed_data = []
-        
         try:
-            for kline in raw_data:
-                timestamp, open_price, high, low, close, volume = kline
-                
-                # 转换时间戳
-                dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-                
-                # 构建K线数据字典
-                kline_dict = {
-                    'symbol': SYMBOL_MAPPING.get(symbol, symbol),
+            if not raw_data:
+                return []
+            
+            mapped_symbol = SYMBOL_MAPPING.get(symbol, symbol)
+            
+            # 循环内用到的函数与常量绑定为局部变量，减少每根K线的属性查找
+            fromtimestamp = datetime.fromtimestamp
+            utc = timezone.utc
+            
+            # 直接逐行构建dict：写入MongoDB需要的就是dict，每批只有几十到几百行，
+            # 先构建DataFrame再to_dict('records')反而多出一次转换。
+            # 行情字段逐个转换为float：交易所可能在任意一行返回int或None（None会使整批处理失败）；
+            # 技术指标字段每根K线使用各自的空容器
+            processed_data = [
+                {
+                    'symbol': mapped_symbol,
                     'timeframe': timeframe,
-                    'timestamp': dt,
+                    'timestamp': fromtimestamp(timestamp / 1000, tz=utc),
                     'open': float(open_price),
                     'high': float(high),
                     'low': float(low),
                     'close': float(close),
                     'volume': float(volume),
-                    # 技术指标字段初始化为空
                     'ma': {},
                     'rsi': None,
                     'macd': {},
@@ -123,8 +317,8 @@ class CCXTDataCollector:
                     'kdj': {},
                     'signals': [],
                 }
-                
-                processed_data.append(kline_dict)
+                for timestamp, open_price, high, low, close, volume in raw_data
+            ]
             
             logger.debug(f"成功处理K线数据: {symbol} {timeframe}, 数量: {len(processed_data)}")
             return processed_data
@@ -135,27 +329,52 @@ class CCXTDataCollector:
     
     def get_latest_timestamp(self, symbol: str, timeframe: str) -> Optional[datetime]:
         """
-        获取数据库中最新的K线时间戳
+        获取数据库中最新的K线时间戳（进程内缓存，首次访问时从数据库读取）
         
         Args:
             symbol: 币种符号
             timeframe: 时间周期
             
         Returns:
-            Optional[datetime]: 最新时间戳
+            Optional[datetime]: 最新时间戳（UTC）
         """
+        key = (symbol, timeframe)
+        latest = self._latest_ts.get(key)
+        if latest is not None:
+            return latest
+        
         try:
             latest_kline = mongodb_client.get_latest_kline(symbol, timeframe)
-            if latest_kline:
-                return latest_kline.get('timestamp')
-            return None
+            if not latest_kline:
+                return None
+            
+            latest = latest_kline.get('timestamp')
+            if latest is not None and latest.tzinfo is None:
+                # 数据库读出的时间不带时区，统一为UTC以便与采集的K线时间比较
+                latest = latest.replace(tzinfo=timezone.utc)
+            self._latest_ts[key] = latest
+            return latest
         except Exception as e:
             logger.error(f"获取最新时间戳失败 {symbol} {timeframe}: {e}")
             return None
     
+    def _update_latest_timestamp(self, symbol: str, timeframe: str, timestamp: datetime):
+        """
+        写入成功后更新缓存的最新K线时间
+        
+        Args:
+            symbol: 币种符号
+            timeframe: 时间周期
+            timestamp: 已写入的K线时间
+        """
+        key = (symbol, timeframe)
+        latest = self._latest_ts.get(key)
+        if latest is None or timestamp > latest:
+            self._latest_ts[key] = timestamp
+    
     def is_kline_exists(self, symbol: str, timeframe: str, timestamp: datetime) -> bool:
         """
-        检查K线是否已存在
+        检查K线是否已存在（与缓存的最新K线时间比较，不查询数据库）
         
         Args:
             symbol: 币种符号
@@ -165,55 +384,140 @@ class CCXTDataCollector:
         Returns:
             bool: 是否存在
         """
-        try:
-            return mongodb_client.kline_exists(symbol, timeframe, timestamp)
-        except Exception as e:
-            logger.error(f"检查K线存在性失败 {symbol} {timeframe}: {e}")
-            return False
+        latest = self.get_latest_timestamp(symbol, timeframe)
+        return latest is not None and timestamp <= latest
     
-    def collect_and_store_data(self) -> bool:
+    def _store_klines(self, raw_data: Optional[List[List]], symbol: str, timeframe: str,
+                      trigger_calculation: bool = False) -> Optional[int]:
         """
-        采集并存储所有配置的交易对和时间周期的数据（初始化用）
+        处理并存储单个交易对、单个时间周期的K线数据
         
+        Args:
+            raw_data: 原始K线数据
+            symbol: 交易对符号
+            timeframe: 时间周期
+            trigger_calculation: 有新增K线时是否触发技术指标和信号计算
+            
         Returns:
-            bool: 采集是否成功
+            Optional[int]: 新增的K线数量，获取、处理或写入失败时为None
         """
-        success_count = 0
-        total_count = len(SYMBOLS) * len(TIMEFRAMES)
+        if raw_data is None:
+            return None
+        if not raw_data:
+            return 0
         
-        logger.info("开始采集加密货币K线数据...")
+        # 处理数据
+        processed_data = self.process_kline_data(raw_data, symbol, timeframe)
+        if not processed_data:
+            return None
         
+        mapped_symbol = processed_data[0]['symbol']
+        
+        if self.get_latest_timestamp(mapped_symbol, timeframe) is None:
+            # 该周期尚无数据（历史回填），直接批量插入
+            inserted = mongodb_client.insert_many_klines(processed_data)
+        else:
+            # 批量存储到数据库，已存在的K线只更新行情字段
+            inserted = mongodb_client.bulk_upsert_klines(processed_data)
+        if inserted is None:
+            return None
+        
+        self._update_latest_timestamp(mapped_symbol, timeframe, processed_data[-1]['timestamp'])
+        if not inserted:
+            return 0
+        
+        if trigger_calculation:
+            logger.info(f"新增K线数据: {mapped_symbol} {timeframe}, 数量: {inserted}")
+            
+            # 新增数据后，触发技术指标和信号计算
+            self._trigger_indicators_calculation(mapped_symbol, timeframe)
+        
+        return inserted
+    
+    def _since_by_symbol(self, timeframe: str) -> Dict[str, int]:
+        """
+        计算增量采集的起始时间：从数据库中最新的K线开始
+        
+        包含最新的那根K线，使其在采集时尚未收盘的行情得到更新。
+        
+        Args:
+            timeframe: 时间周期
+            
+        Returns:
+            Dict[str, int]: 交易对 -> 起始时间（毫秒时间戳），无历史数据的交易对不包含在内
+        """
+        since = {}
         for symbol in SYMBOLS:
-            for timeframe in TIMEFRAMES:
+            latest = self.get_latest_timestamp(SYMBOL_MAPPING.get(symbol, symbol), timeframe)
+            if latest is not None:
+                since[symbol] = int(latest.timestamp() * 1000)
+        return since
+    
+    async def _collect_all(self, limit: int = None, trigger_calculation: bool = False,
+                           incremental: bool = False) -> Tuple[int, int]:
+        """
+        并发采集所有配置的交易对和时间周期
+        
+        所有交易所请求在同一事件循环中并发发出，请求频率由ccxt的enableRateLimit控制；
+        请求全部完成后再依次写入数据库。
+        
+        Args:
+            limit: 每个周期获取的K线数量
+            trigger_calculation: 有新增K线时是否触发技术指标和信号计算
+            incremental: 是否只获取数据库中最新K线之后的数据
+            
+        Returns:
+            Tuple[int, int]: (成功的交易对/时间周期组合数, 新增的K线总数)
+        """
+        # 每个时间周期一次批量请求，各时间周期之间并发
+        async with self._async_exchange() as exchange:
+            results = await asyncio.gather(
+                *(
+                    self.fetch_klines_multi(
+                        exchange, SYMBOLS, timeframe, limit,
+                        since=self._since_by_symbol(timeframe) if incremental else None
+                    )
+                    for timeframe in TIMEFRAMES
+                ),
+                return_exceptions=True
+            )
+        
+        success_count = 0
+        inserted_count = 0
+        for timeframe, klines_by_symbol in zip(TIMEFRAMES, results):
+            if isinstance(klines_by_symbol, BaseException):
+                logger.error(f"采集数据失败 {timeframe}: {klines_by_symbol}")
+                continue
+            
+            for symbol, raw_data in klines_by_symbol.items():
                 try:
-                    # 获取K线数据
-                    raw_data = self.fetch_klines(symbol, timeframe)
-                    
-                    if raw_data:
-                        # 处理数据
-                        processed_data = self.process_kline_data(raw_data, symbol, timeframe)
-                        
-                        if processed_data:
-                            # 存储到数据库
-                            for kline in processed_data:
-                                # 检查是否已存在，避免重复插入
-                                if not self.is_kline_exists(kline['symbol'], kline['timeframe'], kline['timestamp']):
-                                    if mongodb_client.insert_kline(kline):
-                                        success_count += 1
-                                else:
-                                    logger.debug(f"K线已存在，跳过: {kline['symbol']} {kline['timeframe']} {kline['timestamp']}")
-                    
-                    # 添加延迟以避免触发API限制
-                    time.sleep(0.1)
-                    
+                    inserted = self._store_klines(raw_data, symbol, timeframe, trigger_calculation)
                 except Exception as e:
                     logger.error(f"采集数据失败 {symbol} {timeframe}: {e}")
                     continue
+                if inserted is not None:
+                    success_count += 1
+                    inserted_count += inserted
         
-        logger.info(f"数据采集完成，成功: {success_count}/{total_count}")
+        return success_count, inserted_count
+    
+    async def collect_and_store_data(self) -> bool:
+        """
+        采集并存储所有配置的交易对和时间周期的数据（初始化用）
+        
+        Returns:
+            bool: 采集是否成功
+        """
+        total_count = len(SYMBOLS) * len(TIMEFRAMES)
+        
+        logger.info("开始采集加密货币K线数据...")
+        
+        success_count, inserted_count = await self._collect_all()
+        
+        logger.info(f"数据采集完成，新增: {inserted_count}, 成功: {success_count}/{total_count}")
         return success_count > 0
     
-    def collect_latest_data(self) -> bool:
+    async def collect_latest_data(self) -> bool:
         """
         采集最新的K线数据（用于定时更新，每分钟调用）
         只获取和存储新的数据，避免重复
@@ -221,43 +525,16 @@ class CCXTDataCollector:
         Returns:
             bool: 采集是否成功
         """
-        success_count = 0
-        new_data_count = 0
         total_count = len(SYMBOLS) * len(TIMEFRAMES)
         
         logger.info("采集最新K线数据...")
         
-        for symbol in SYMBOLS:
-            for timeframe in TIMEFRAMES:
-                try:
-                    # 获取最新的5根K线（确保能捕获最新数据）
-                    raw_data = self.fetch_klines(symbol, timeframe, limit=5)
-                    
-                    if raw_data:
-                        # 处理数据
-                        processed_data = self.process_kline_data(raw_data, symbol, timeframe)
-                        
-                        if processed_data:
-                            # 只存储不存在的K线数据
-                            for kline in processed_data:
-                                if not self.is_kline_exists(kline['symbol'], kline['timeframe'], kline['timestamp']):
-                                    if mongodb_client.insert_kline(kline):
-                                        success_count += 1
-                                        new_data_count += 1
-                                        logger.info(f"新增K线数据: {kline['symbol']} {kline['timeframe']} {kline['timestamp']}")
-                                        
-                                        # 新增数据后，触发技术指标和信号计算
-                                        self._trigger_indicators_calculation(kline['symbol'], kline['timeframe'])
-                    
-                    # 添加延迟以避免触发API限制
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(f"采集最新数据失败 {symbol} {timeframe}: {e}")
-                    continue
+        # 从数据库中最新的K线开始获取（最多5根），无历史数据的周期获取最新的5根
+        success_count, new_data_count = await self._collect_all(limit=5, trigger_calculation=True,
+                                                                incremental=True)
         
         logger.info(f"最新数据采集完成，新增: {new_data_count}, 成功: {success_count}/{total_count}")
-        return success_count > 0
+        return new_data_count > 0
     
     def _trigger_indicators_calculation(self, symbol: str, timeframe: str):
         """
@@ -293,8 +570,16 @@ class CCXTDataCollector:
         try:
             market_info = {}
             
+            # 交易所支持时一次请求获取所有交易对的行情，否则逐个获取
+            if self.exchange.has.get('fetchTickers'):
+                tickers = self.exchange.fetch_tickers(SYMBOLS)
+            else:
+                tickers = {symbol: self.exchange.fetch_ticker(symbol) for symbol in SYMBOLS}
+            
             for symbol in SYMBOLS:
-                ticker = self.exchange.fetch_ticker(symbol)
+                ticker = tickers.get(symbol)
+                if ticker is None:
+                    continue
                 market_info[symbol] = {
                     'last_price': ticker['last'],
                     '24h_change': ticker['percentage'],
@@ -312,7 +597,9 @@ class CCXTDataCollector:
     
     def fetch_ohlcv_data(self, symbol: str, timeframe: str, limit: int = None) -> Optional[List[List]]:
         """
-        获取OHLCV数据（fetch_klines的别名方法）
+        获取OHLCV数据（fetch_klines的同步版本）
+        
+        通过同步交易所实例请求，不创建事件循环，因此在已运行的事件循环中也可以调用。
         
         Args:
             symbol: 交易对符号
@@ -322,8 +609,32 @@ class CCXTDataCollector:
         Returns:
             Optional[List[List]]: K线数据列表
         """
-        return self.fetch_klines(symbol, timeframe, limit)
+        if limit is None:
+            limit = HISTORICAL_LIMIT
+        
+        if self.exchange is None:
+            logger.error(f"获取K线数据失败 {symbol} {timeframe}: 交易所未初始化")
+            return None
+        
+        for attempt in range(FETCH_MAX_ATTEMPTS):
+            try:
+                ohlcv = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
+                
+                logger.debug(f"成功获取K线数据: {symbol} {timeframe}, 数量: {len(ohlcv)}")
+                return ohlcv
+                
+            except ccxt.NetworkError as e:
+                delay = _retry_delay(attempt, symbol, timeframe, e)
+                if delay is None:
+                    return None
+                time.sleep(delay)
+                
+            except Exception as e:
+                logger.error(f"获取K线数据失败 {symbol} {timeframe}: {e}")
+                return None
+        
+        return None
 
 
-# 全局数据采集器实例
+# 全局数据采集器实例（交易所在首次使用时初始化）
 data_collector = CCXTDataCollector() 
\ No newline at end of file
@@ -3,15 +3,55 @@ MongoDB数据库连接管理模块
 提供数据库连接、操作和管理功能
 """
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from pymongo import MongoClient, DESCENDING
+from bson.codec_options import CodecOptions
+from pymongo import MongoClient, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.write_concern import WriteConcern
 from config.settings import MONGODB_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# K线按 (币种, 周期, 时间) 查询使用的复合唯一索引，同一根K线只能有一条记录；
+# 按时间倒序查询时反向遍历该索引
+KLINE_LOOKUP_INDEX = [
+    ("symbol", 1),
+    ("timeframe", 1),
+    ("timestamp", 1)
+]
+KLINE_LOOKUP_INDEX_NAME = 'symbol_1_timeframe_1_timestamp_1'
+
+# 旧版本的非唯一复合索引，由 migrate_kline_index.py 去重后替换为 KLINE_LOOKUP_INDEX
+LEGACY_KLINE_LOOKUP_INDEX_NAME = 'symbol_1_timeframe_1_timestamp_-1'
+
+# 信号部分索引的过滤条件：只索引至少有一个信号的K线
+SIGNALS_INDEX_FILTER = {"signals.0": {"$exists": True}}
+
+# K线中随最新行情变化的字段，重复采集时只更新这些字段，已计算的指标与信号保持不变
+KLINE_MUTABLE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# MongoDB重复键错误码
+DUPLICATE_KEY_ERROR = 11000
+
+# 查询K线时单批返回的最大文档数，limit不超过该值时一次往返取回全部结果
+MAX_CURSOR_BATCH_SIZE = 1000
+
+# 批量计算指标/信号时缓冲的更新数量，达到后一次bulk_write写入
+BULK_UPDATE_BATCH_SIZE = 1000
+
+# 查询接口使用的解码选项：普通dict、不做时区转换，遇到非法UTF-8时替换而不是抛错
+READ_CODEC_OPTIONS = CodecOptions(
+    document_class=dict,
+    tz_aware=False,
+    unicode_decode_error_handler='replace'
+)
+
+# K线写入使用的写关注：K线可从交易所重新获取且写入是幂等的，不等待日志落盘
+KLINE_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
 
 class MongoDBClient:
     """MongoDB客户端管理类"""
@@ -21,6 +61,8 @@ class MongoDBClient:
         self.client: Optional[MongoClient] = None
         self.database: Optional[Database] = None
         self.collection: Optional[Collection] = None
+        self.read_collection: Optional[Collection] = None
+        self.kline_collection: Optional[Collection] = None
         self.connect()
     
     def connect(self) -> bool:
@@ -46,9 +88,21 @@ class MongoDBClient:
                 )
             
             # 建立连接
-            self.client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
+            # minPoolSize让驱动在后台预先建立连接，首个请求无需等待建连
+            self.client = MongoClient(
+                connection_string,
+                serverSelectionTimeoutMS=MONGODB_CONFIG['server_selection_timeout_ms'],
+                socketTimeoutMS=MONGODB_CONFIG['socket_timeout_ms'],
+                maxPoolSize=MONGODB_CONFIG['max_pool_size'],
+                minPoolSize=MONGODB_CONFIG['min_pool_size'],
+                retryWrites=True,
+                compressors=MONGODB_CONFIG['compressors']
+            )
             self.database = self.client[MONGODB_CONFIG['database']]
             self.collection = self.database[MONGODB_CONFIG['collection']]
+            self.read_collection = self.collection.with_options(codec_options=READ_CODEC_OPTIONS)
+            # K线采集写入使用宽松的写关注，指标与信号更新仍使用默认写关注
+            self.kline_collection = self.collection.with_options(write_concern=KLINE_WRITE_CONCERN)
             
             # 测试连接
             self.client.admin.command('ping')
@@ -66,28 +120,59 @@ class MongoDBClient:
     def _create_indexes(self):
         """创建数据库索引以优化查询性能"""
         try:
-            # 创建复合索引
-            self.collection.create_index([
-                ("symbol", 1),
-                ("timeframe", 1),
-                ("timestamp", -1)
-            ])
+            existing_indexes = self.collection.index_information()
+            
+            # 旧版本的单独时间戳索引：查询都带有币种条件，由复合索引覆盖，删除以减少写入开销
+            if 'timestamp_-1' in existing_indexes:
+                self.collection.drop_index('timestamp_-1')
             
-            # 创建时间戳索引
-            self.collection.create_index([("timestamp", -1)])
+            # 旧版本的全量信号索引，替换为只包含有信号K线的部分索引
+            signals_index = existing_indexes.get('signals_1')
+            if signals_index and 'partialFilterExpression' not in signals_index:
+                self.collection.drop_index('signals_1')
             
-            # 创建信号索引
-            self.collection.create_index([("signals", 1)])
+            # 创建复合唯一索引，多个采集进程同时回填时重复的K线会被拒绝；
+            # 已有旧版本非唯一索引的集合可能包含重复K线，需要先运行迁移脚本去重
+            if KLINE_LOOKUP_INDEX_NAME in existing_indexes or LEGACY_KLINE_LOOKUP_INDEX_NAME not in existing_indexes:
+                self.collection.create_index(KLINE_LOOKUP_INDEX, name=KLINE_LOOKUP_INDEX_NAME, unique=True)
+            else:
+                logger.warning("K线索引尚未迁移为唯一索引，请运行: python migrate_kline_index.py")
+            
+            # 创建信号索引（查询条件需包含 SIGNALS_INDEX_FILTER 才能使用该索引）
+            self.collection.create_index([("signals", 1)], partialFilterExpression=SIGNALS_INDEX_FILTER)
             
             logger.info("数据库索引创建成功")
             
         except Exception as e:
             logger.warning(f"创建索引时出现警告: {e}")
     
+    @staticmethod
+    def _kline_upsert_update(kline: Dict, now: datetime) -> Dict:
+        """
+        构建K线upsert的更新文档：行情字段每次覆盖，其余字段（指标、信号等）只在首次插入时写入
+        
+        Args:
+            kline: K线数据字典
+            now: 写入时间
+            
+        Returns:
+            Dict: 包含 $set 与 $setOnInsert 的更新文档
+        """
+        mutable = {field: kline[field] for field in KLINE_MUTABLE_FIELDS}
+        mutable['updated_at'] = now
+        initial = {
+            field: value for field, value in kline.items()
+            if field not in mutable
+        }
+        initial['created_at'] = now
+        return {'$set': mutable, '$setOnInsert': initial}
+    
     def insert_kline(self, kline_data: Dict) -> bool:
         """
         插入K线数据
         
+        已存在的K线只更新行情字段，不会覆盖已计算的技术指标与信号。
+        
         Args:
             kline_data: K线数据字典
             
@@ -95,10 +180,6 @@ class MongoDBClient:
             bool: 插入是否成功
         """
         try:
-            # 添加时间戳
-            kline_data['created_at'] = datetime.utcnow()
-            kline_data['updated_at'] = datetime.utcnow()
-            
             # 使用upsert模式，避免重复数据
             query = {
                 'symbol': kline_data['symbol'],
@@ -106,9 +187,9 @@ class MongoDBClient:
                 'timestamp': kline_data['timestamp']
             }
             
-            result = self.collection.update_one(
+            result = self.kline_collection.update_one(
                 query,
-                {'$set': kline_data},
+                self._kline_upsert_update(kline_data, datetime.utcnow()),
                 upsert=True
             )
             
@@ -123,7 +204,97 @@ class MongoDBClient:
             logger.error(f"插入K线数据失败: {e}")
             return False
     
-    def get_historical_data(self, symbol: str, timeframe: str, limit: int = 60) -> List[Dict]:
+    def bulk_upsert_klines(self, klines: List[Dict]) -> Optional[int]:
+        """
+        批量插入K线数据（一次bulk_write完成，已存在的K线只更新行情字段）
+        
+        Args:
+            klines: K线数据字典列表
+            
+        Returns:
+            Optional[int]: 新插入的K线数量，失败时返回None
+        """
+        if not klines:
+            return 0
+        
+        try:
+            now = datetime.utcnow()
+            operations = []
+            for kline in klines:
+                query = {
+                    'symbol': kline['symbol'],
+                    'timeframe': kline['timeframe'],
+                    'timestamp': kline['timestamp']
+                }
+                operations.append(UpdateOne(query, self._kline_upsert_update(kline, now), upsert=True))
+            
+            result = self.kline_collection.bulk_write(operations, ordered=False)
+            
+            logger.debug(
+                f"批量写入K线数据: {klines[0]['symbol']} {klines[0]['timeframe']}, "
+                f"新增: {result.upserted_count}, 更新: {result.modified_count}"
+            )
+            return result.upserted_count
+            
+        except Exception as e:
+            logger.error(f"批量写入K线数据失败: {e}")
+            return None
+    
+    def insert_many_klines(self, klines: List[Dict]) -> Optional[int]:
+        """
+        批量插入新K线（用于历史数据回填，数据库中尚无该周期数据时比upsert更快）
+        
+        已存在的K线违反唯一索引触发重复键错误，这些错误会被忽略。
+        
+        Args:
+            klines: K线数据字典列表
+            
+        Returns:
+            Optional[int]: 插入的K线数量，失败时返回None
+        """
+        if not klines:
+            return 0
+        
+        try:
+            now = datetime.utcnow()
+            documents = [{**kline, 'created_at': now, 'updated_at': now} for kline in klines]
+            result = self.kline_collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+            
+        except BulkWriteError as e:
+            other_errors = [
+                error for error in e.details.get('writeErrors', [])
+                if error.get('code') != DUPLICATE_KEY_ERROR
+            ]
+            if other_errors:
+                logger.error(f"批量插入K线数据失败: {other_errors[0].get('errmsg')}")
+            return e.details.get('nInserted', 0)
+            
+        except Exception as e:
+            logger.error(f"批量插入K线数据失败: {e}")
+            return None
+    
+    def _recent_klines_cursor(self, query: Dict, limit: int, projection: Optional[Dict] = None):
+        """
+        按时间倒序查询最新的K线（由复合索引覆盖排序），结果在一个批次内返回
+        
+        Args:
+            query: 包含币种与时间周期的查询条件
+            limit: 获取数量限制
+            projection: 返回字段，默认返回全部字段
+            
+        Returns:
+            Cursor: 查询游标
+        """
+        return (
+            self.collection.find(query, projection)
+            .sort('timestamp', DESCENDING)
+            .limit(limit)
+            .batch_size(min(limit, MAX_CURSOR_BATCH_SIZE))
+        )
+    
+    def get_historical_data(self, symbol: str, timeframe: str, limit: int = 60,
+                            projection: Optional[Dict] = None) -> List[Dict]:
         """
         获取历史K线数据
         
@@ -131,6 +302,7 @@ class MongoDBClient:
             symbol: 币种符号
             timeframe: 时间周期
             limit: 获取数量限制
+            projection: 返回字段，默认返回全部字段
             
         Returns:
             List[Dict]: 历史K线数据列表
@@ -141,8 +313,7 @@ class MongoDBClient:
                 'timeframe': timeframe
             }
             
-            cursor = self.collection.find(query).sort('timestamp', DESCENDING).limit(limit)
-            data = list(cursor)
+            data = list(self._recent_klines_cursor(query, limit, projection))
             
             # 按时间正序排列
             data.reverse()
@@ -195,6 +366,34 @@ class MongoDBClient:
             logger.error(f"更新技术指标失败: {e}")
             return False
     
+    def bulk_update(self, updates: List[Tuple[Dict, Dict]]) -> Optional[int]:
+        """
+        批量更新已存在的K线（技术指标、信号等），一次往返完成所有更新
+        
+        Args:
+            updates: (查询条件, 待更新字段) 列表
+            
+        Returns:
+            Optional[int]: 实际修改的K线数量，失败时返回None
+        """
+        if not updates:
+            return 0
+        
+        try:
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(query, {'$set': {**fields, 'updated_at': now}})
+                for query, fields in updates
+            ]
+            result = self.collection.bulk_write(operations, ordered=False)
+            
+            logger.debug(f"批量更新K线数据: {len(updates)}条, 修改: {result.modified_count}")
+            return result.modified_count
+            
+        except Exception as e:
+            logger.error(f"批量更新K线数据失败: {e}")
+            return None
+    
     def update_signals(self, symbol: str, timeframe: str, timestamp: datetime, signals: List[str]) -> bool:
         """
         更新技术信号
@@ -254,8 +453,7 @@ class MongoDBClient:
                 'timeframe': timeframe
             }
             
-            cursor = self.collection.find(query).sort('timestamp', DESCENDING).limit(limit)
-            data = list(cursor)
+            data = list(self._recent_klines_cursor(query, limit))
             
             logger.debug(f"获取最新数据: {symbol} {timeframe}, 数量: {len(data)}")
             return data
@@ -264,13 +462,14 @@ class MongoDBClient:
             logger.error(f"获取最新数据失败: {e}")
             return []
     
-    def get_latest_kline(self, symbol: str, timeframe: str) -> Optional[Dict]:
+    def get_latest_kline(self, symbol: str, timeframe: str, projection: Optional[Dict] = None) -> Optional[Dict]:
         """
         获取最新的K线记录
         
         Args:
             symbol: 币种符号
             timeframe: 时间周期
+            projection: 返回字段，默认返回全部字段
             
         Returns:
             Optional[Dict]: 最新K线数据
@@ -281,7 +480,7 @@ class MongoDBClient:
                 'timeframe': timeframe
             }
             
-            latest = self.collection.find_one(query, sort=[('timestamp', DESCENDING)])
+            latest = self.collection.find_one(query, projection=projection, sort=[('timestamp', DESCENDING)])
             
             if latest:
                 logger.debug(f"获取到最新K线: {symbol} {timeframe} {latest.get('timestamp')}")
@@ -313,8 +512,8 @@ class MongoDBClient:
                 'timestamp': timestamp
             }
             
-            count = self.collection.count_documents(query)
-            exists = count > 0
+            # 只需判断是否存在，命中索引后立即返回，无需计数
+            exists = self.collection.find_one(query, projection={'_id': 1}) is not None
             
             logger.debug(f"检查K线存在性: {symbol} {timeframe} {timestamp} -> {exists}")
             return exists
@@ -344,7 +543,8 @@ class MongoDBClient:
                 return {"error": "数据库未连接"}
             
             stats = self.database.command("dbstats")
-            collection_stats = self.collection.count_documents({})
+            # 使用集合元数据估算文档数，避免全集合计数
+            collection_stats = self.collection.estimated_document_count()
             
             return {
                 "database": self.database.name,
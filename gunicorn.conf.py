@@ -0,0 +1,42 @@
+"""
+gunicorn配置文件
+API服务以I/O等待（MongoDB查询）为主，使用gevent协程worker提升并发
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('API_BIND', '0.0.0.0:5000')
+worker_class = 'gevent'
+workers = int(os.getenv('API_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.getenv('API_WORKER_CONNECTIONS', 1000))
+
+# 每个worker自行创建MongoDB连接池，不在fork前预加载应用
+preload_app = False
+
+# 每个worker的MongoDB连接池上限：协程共享连接池，超出的请求排队等待空闲连接，
+# 不随worker_connections放大，避免 workers × worker_connections 个数据库连接
+API_MONGODB_MAX_POOL_SIZE = 32
+os.environ.setdefault('MONGODB_MAX_POOL_SIZE', str(min(worker_connections, API_MONGODB_MAX_POOL_SIZE)))
+
+# API请求的数据库操作都是小查询，使用较短的超时，数据库异常时尽快返回错误而不是占住worker
+os.environ.setdefault('MONGODB_SOCKET_TIMEOUT_MS', '3000')
+os.environ.setdefault('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '2000')
+
+# 生产环境默认只记录WARNING及以上日志
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+
+def post_worker_init(worker):
+    """
+    worker加载应用后预热MongoDB连接，避免首个请求承担建连耗时
+    
+    post_fork钩子执行时gevent尚未完成monkey patch，在那里创建的连接无法协程化，
+    因此放在应用加载之后进行。
+    """
+    from database.mongo_client import mongodb_client
+    
+    try:
+        mongodb_client.client.admin.command('ping')
+        worker.log.info("MongoDB连接预热完成")
+    except Exception as e:
+        worker.log.warning("MongoDB连接预热失败: %s", e)
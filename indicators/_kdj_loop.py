@@ -0,0 +1,39 @@
+"""
+KDJ递推计算内核
+"""
+from typing import Tuple
+import numpy as np
+
+from indicators._njit import njit
+
+
+# 显式签名：导入时即编译并缓存到磁盘，首次调用无需等待JIT
+@njit('Tuple((f8[:], f8[:], f8[:]))(f8[:])', cache=True)
+def _kdj_loop(rsv: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    根据RSV逐根递推K、D、J值
+    
+    K、D初始值为50；RSV为NaN（窗口未满）时K保持不变，D仍按当前K平滑。
+    
+    Args:
+        rsv: 未成熟随机值序列
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: K、D、J序列
+    """
+    n = rsv.shape[0]
+    k_values = np.empty(n)
+    d_values = np.empty(n)
+    j_values = np.empty(n)
+    
+    k = 50.0
+    d = 50.0
+    for i in range(n):
+        if not np.isnan(rsv[i]):
+            k = (2.0 / 3.0) * k + (1.0 / 3.0) * rsv[i]
+        d = (2.0 / 3.0) * d + (1.0 / 3.0) * k
+        k_values[i] = k
+        d_values[i] = d
+        j_values[i] = 3.0 * k - 2.0 * d
+    
+    return k_values, d_values, j_values
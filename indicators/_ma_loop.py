@@ -0,0 +1,35 @@
+"""
+移动平均线计算内核
+"""
+import numpy as np
+
+from indicators._njit import njit
+
+
+# 与KDJ内核相同，按签名在导入时编译
+@njit('f8[:](f8[:], i8[:])', cache=True)
+def _sma_last(close: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    计算各周期简单移动平均线的最新值
+    
+    从最新一根K线向前累加，与倒序累加和的算法一致，周期超出数据长度时为NaN。
+    
+    Args:
+        close: 收盘价序列
+        periods: 均线周期（int64）
+        
+    Returns:
+        np.ndarray: 各周期均线的最新值
+    """
+    n = close.shape[0]
+    out = np.empty(periods.shape[0])
+    for i in range(periods.shape[0]):
+        period = periods[i]
+        if period <= 0 or period > n:
+            out[i] = np.nan
+            continue
+        total = 0.0
+        for j in range(n - 1, n - 1 - period, -1):
+            total += close[j]
+        out[i] = total / period
+    return out
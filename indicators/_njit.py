@@ -0,0 +1,21 @@
+"""
+Numba兼容层
+安装了numba时使用其njit/prange编译数值循环，未安装时退化为普通Python函数
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # 未安装numba时按纯Python执行，结果一致
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """与numba.njit同签名的空装饰器，支持 @njit 与 @njit(...) 两种用法"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        return decorator
+
+__all__ = ['njit', 'prange', 'NUMBA_AVAILABLE']
@@ -0,0 +1,314 @@
+"""
+技术信号检测内核
+每个内核只读取展平后的float64指标数组，返回该类信号的位掩码，
+第i位对应同类信号元组中的第i个信号；缺失值为NaN。
+"""
+from itertools import accumulate
+from typing import Tuple
+import numpy as np
+
+from indicators._njit import njit
+
+
+RSI_SIGNALS = ('RSI_OVERSOLD', 'RSI_OVERBOUGHT', 'RSI_DIVERGENCE_BULLISH', 'RSI_DIVERGENCE_BEARISH')
+MACD_SIGNALS = ('MACD_BULLISH_CROSS', 'MACD_BEARISH_CROSS', 'MACD_ZERO_CROSS_UP', 'MACD_ZERO_CROSS_DOWN',
+                'MACD_DIVERGENCE_BULLISH', 'MACD_DIVERGENCE_BEARISH')
+MA_SIGNALS = ('MA_GOLDEN_CROSS', 'MA_DEATH_CROSS', 'MA_BULLISH_ARRANGEMENT', 'MA_BEARISH_ARRANGEMENT',
+              'PRICE_ABOVE_MA50', 'PRICE_BELOW_MA50')
+BOLLINGER_SIGNALS = ('BB_SQUEEZE', 'BB_EXPANSION', 'BB_UPPER_TOUCH', 'BB_LOWER_TOUCH',
+                     'BB_MIDDLE_CROSS_UP', 'BB_MIDDLE_CROSS_DOWN')
+KDJ_SIGNALS = ('KDJ_OVERSOLD', 'KDJ_OVERBOUGHT', 'KDJ_GOLDEN_CROSS', 'KDJ_DEATH_CROSS')
+STOCH_SIGNALS = ('STOCH_OVERSOLD', 'STOCH_OVERBOUGHT', 'STOCH_BULLISH_CROSS', 'STOCH_BEARISH_CROSS')
+CCI_SIGNALS = ('CCI_OVERSOLD', 'CCI_OVERBOUGHT', 'CCI_ZERO_CROSS_UP', 'CCI_ZERO_CROSS_DOWN')
+VOLUME_SIGNALS = ('VOLUME_SPIKE', 'VOLUME_DRY')
+
+# 各类信号依次拼接为全部信号名称，合并后的掩码中第i位对应SIGNAL_NAMES[i]
+_SIGNAL_GROUPS = (RSI_SIGNALS, MACD_SIGNALS, MA_SIGNALS, BOLLINGER_SIGNALS,
+                  KDJ_SIGNALS, STOCH_SIGNALS, CCI_SIGNALS, VOLUME_SIGNALS)
+SIGNAL_NAMES = tuple(name for group in _SIGNAL_GROUPS for name in group)
+
+# 各类信号在合并掩码中的起始位，内核返回的掩码左移对应位数后合并
+(RSI_SHIFT, MACD_SHIFT, MA_SHIFT, BOLLINGER_SHIFT,
+ KDJ_SHIFT, STOCH_SHIFT, CCI_SHIFT, VOLUME_SHIFT) = accumulate((len(group) for group in _SIGNAL_GROUPS[:-1]), initial=0)
+
+
+# 与指标计算内核一样按显式签名在导入时编译；nogil释放GIL，多线程批量检测时可并行执行
+@njit('u4(f8[:], f8[:])', cache=True, nogil=True)
+def _divergence(values: np.ndarray, close: np.ndarray) -> int:
+    """
+    最近5根K线的价格背离：第0位为看涨背离（价格新低而指标未新低），第1位为看跌背离
+    
+    调用方保证当前指标值有效且至少有5根K线；之前缺失的指标值跳过，有效值不足3个时不判断。
+    只比较前4根，用两两取最值的固定比较代替切片归约，不分配临时数组。
+    """
+    current_value = values[-1]
+    value_min = np.inf
+    value_max = -np.inf
+    valid = 1
+    for i in range(values.shape[0] - 5, values.shape[0] - 1):
+        value = values[i]
+        if not np.isnan(value):
+            valid += 1
+            value_min = min(value_min, value)
+            value_max = max(value_max, value)
+    if valid < 3:
+        return 0
+    
+    p0 = close[-5]
+    p1 = close[-4]
+    p2 = close[-3]
+    p3 = close[-2]
+    current_close = close[-1]
+    
+    mask = 0
+    if current_close < min(min(p0, p1), min(p2, p3)) and current_value > value_min:
+        mask |= 1
+    if current_close > max(max(p0, p1), max(p2, p3)) and current_value < value_max:
+        mask |= 2
+    return mask
+
+
+@njit('u4(f8[:], f8[:], f8, f8)', cache=True, nogil=True)
+def _rsi_kernel(rsi: np.ndarray, close: np.ndarray, oversold: float, overbought: float) -> int:
+    """RSI超买超卖与最近5根K线的价格背离"""
+    mask = 0
+    if rsi.shape[0] < 2:
+        return mask
+    
+    current_rsi = rsi[-1]
+    if np.isnan(current_rsi):
+        return mask
+    
+    if current_rsi < oversold:
+        mask |= 1
+    elif current_rsi > overbought:
+        mask |= 2
+    
+    if rsi.shape[0] >= 10 and not np.isnan(rsi[-2]):
+        mask |= _divergence(rsi, close) << 2
+    return mask
+
+
+@njit('u4(f8[:], f8[:], f8[:])', cache=True, nogil=True)
+def _macd_kernel(macd_line: np.ndarray, signal_line: np.ndarray, close: np.ndarray) -> int:
+    """MACD金叉死叉、零轴穿越与价格背离"""
+    mask = 0
+    if macd_line.shape[0] < 2:
+        return mask
+    
+    current_macd = macd_line[-1]
+    current_signal = signal_line[-1]
+    prev_macd = macd_line[-2]
+    prev_signal = signal_line[-2]
+    if np.isnan(current_macd) or np.isnan(current_signal) or np.isnan(prev_macd) or np.isnan(prev_signal):
+        return mask
+    
+    if prev_macd <= prev_signal and current_macd > current_signal:
+        mask |= 1
+    elif prev_macd >= prev_signal and current_macd < current_signal:
+        mask |= 2
+    
+    if prev_macd <= 0 and current_macd > 0:
+        mask |= 4
+    elif prev_macd >= 0 and current_macd < 0:
+        mask |= 8
+    
+    if macd_line.shape[0] >= 10:
+        mask |= _divergence(macd_line, close) << 4
+    return mask
+
+
+@njit('u4(f8[:], f8[:], f8[:], f8[:], f8[:])', cache=True, nogil=True)
+def _ma_kernel(ma5: np.ndarray, ma10: np.ndarray, ma20: np.ndarray, ma50: np.ndarray,
+               close: np.ndarray) -> int:
+    """均线金叉死叉、多空排列与价格相对MA50的位置"""
+    mask = 0
+    if ma5.shape[0] < 2:
+        return mask
+    
+    ma5_curr = ma5[-1]
+    ma10_curr = ma10[-1]
+    ma20_curr = ma20[-1]
+    ma50_curr = ma50[-1]
+    if np.isnan(ma5_curr) or np.isnan(ma10_curr) or np.isnan(ma20_curr) or np.isnan(ma50_curr):
+        return mask
+    
+    ma5_prev = ma5[-2]
+    ma20_prev = ma20[-2]
+    current_close = close[-1]
+    if not (np.isnan(ma5_prev) or np.isnan(ma20_prev)):
+        if ma5_prev <= ma20_prev and ma5_curr > ma20_curr:
+            mask |= 1
+        elif ma5_prev >= ma20_prev and ma5_curr < ma20_curr:
+            mask |= 2
+    
+    if ma5_curr > ma10_curr > ma20_curr > ma50_curr:
+        mask |= 4
+    elif ma5_curr < ma10_curr < ma20_curr < ma50_curr:
+        mask |= 8
+    
+    if current_close > ma50_curr:
+        mask |= 16
+    elif current_close < ma50_curr:
+        mask |= 32
+    return mask
+
+
+@njit('UniTuple(f8, 2)(f8[:], f8[:], f8[:])', cache=True, nogil=True)
+def _window_averages(upper: np.ndarray, lower: np.ndarray, volume: np.ndarray) -> Tuple[float, float]:
+    """
+    前19根K线（不含当前）的布林带平均带宽与平均成交量，一次遍历同时求出
+    
+    不足20根K线时均为NaN；最近20根中有效带宽不足15个时平均带宽为NaN，缺失的带宽跳过。
+    """
+    n = volume.shape[0]
+    if n < 20:
+        return np.nan, np.nan
+    
+    bandwidth_sum = 0.0
+    bandwidth_count = 0 if np.isnan(upper[-1] - lower[-1]) else 1
+    volume_sum = 0.0
+    for i in range(n - 20, n - 1):
+        bandwidth = upper[i] - lower[i]
+        if not np.isnan(bandwidth):
+            bandwidth_sum += bandwidth
+            bandwidth_count += 1
+        volume_sum += volume[i]
+    
+    avg_volume = volume_sum / 19
+    if bandwidth_count < 15:
+        return np.nan, avg_volume
+    # 当前带宽计入有效数量但不参与平均
+    return bandwidth_sum / (bandwidth_count - 1), avg_volume
+
+
+@njit('u4(f8[:], f8[:], f8[:], f8[:], f8)', cache=True, nogil=True)
+def _bollinger_kernel(upper: np.ndarray, middle: np.ndarray, lower: np.ndarray, close: np.ndarray,
+                      avg_bandwidth: float) -> int:
+    """布林带收缩扩张（对比前19根的平均带宽）、触及上下轨与穿越中轨"""
+    mask = 0
+    if close.shape[0] < 20:
+        return mask
+    
+    current_upper = upper[-1]
+    current_middle = middle[-1]
+    current_lower = lower[-1]
+    if np.isnan(current_upper) or np.isnan(current_middle) or np.isnan(current_lower):
+        return mask
+    
+    current_close = close[-1]
+    if not np.isnan(avg_bandwidth):
+        current_bandwidth = current_upper - current_lower
+        if current_bandwidth < avg_bandwidth * 0.8:
+            mask |= 1
+        elif current_bandwidth > avg_bandwidth * 1.2:
+            mask |= 2
+    
+    if current_close >= current_upper * 0.995:
+        mask |= 4
+    elif current_close <= current_lower * 1.005:
+        mask |= 8
+    
+    prev_close = close[-2]
+    prev_middle = middle[-2]
+    if not np.isnan(prev_middle):
+        if prev_close <= prev_middle and current_close > current_middle:
+            mask |= 16
+        elif prev_close >= prev_middle and current_close < current_middle:
+            mask |= 32
+    return mask
+
+
+@njit('u4(f8[:], f8[:], f8[:], f8, f8)', cache=True, nogil=True)
+def _kdj_kernel(k: np.ndarray, d: np.ndarray, j: np.ndarray, oversold: float, overbought: float) -> int:
+    """KDJ超买超卖（按J值）与金叉死叉"""
+    mask = 0
+    if k.shape[0] < 2:
+        return mask
+    
+    k_curr = k[-1]
+    d_curr = d[-1]
+    j_curr = j[-1]
+    if np.isnan(k_curr) or np.isnan(d_curr) or np.isnan(j_curr):
+        return mask
+    
+    if j_curr < oversold:
+        mask |= 1
+    elif j_curr > overbought:
+        mask |= 2
+    
+    k_prev = k[-2]
+    d_prev = d[-2]
+    if not (np.isnan(k_prev) or np.isnan(d_prev)):
+        if k_prev <= d_prev and k_curr > d_curr and j_curr < 80:
+            mask |= 4
+        elif k_prev >= d_prev and k_curr < d_curr and j_curr > 20:
+            mask |= 8
+    return mask
+
+
+@njit('u4(f8[:], f8[:], f8, f8)', cache=True, nogil=True)
+def _stoch_kernel(k: np.ndarray, d: np.ndarray, oversold: float, overbought: float) -> int:
+    """随机振荡器超买超卖与金叉死叉"""
+    mask = 0
+    if k.shape[0] < 2:
+        return mask
+    
+    k_curr = k[-1]
+    d_curr = d[-1]
+    if np.isnan(k_curr) or np.isnan(d_curr):
+        return mask
+    
+    if k_curr < oversold and d_curr < oversold:
+        mask |= 1
+    elif k_curr > overbought and d_curr > overbought:
+        mask |= 2
+    
+    k_prev = k[-2]
+    d_prev = d[-2]
+    if not (np.isnan(k_prev) or np.isnan(d_prev)):
+        if k_prev <= d_prev and k_curr > d_curr and k_curr < 80:
+            mask |= 4
+        elif k_prev >= d_prev and k_curr < d_curr and k_curr > 20:
+            mask |= 8
+    return mask
+
+
+@njit('u4(f8[:], f8, f8)', cache=True, nogil=True)
+def _cci_kernel(cci: np.ndarray, oversold: float, overbought: float) -> int:
+    """CCI超买超卖与零轴穿越"""
+    mask = 0
+    if cci.shape[0] < 2:
+        return mask
+    
+    current_cci = cci[-1]
+    if np.isnan(current_cci):
+        return mask
+    
+    if current_cci < oversold:
+        mask |= 1
+    elif current_cci > overbought:
+        mask |= 2
+    
+    prev_cci = cci[-2]
+    if not np.isnan(prev_cci):
+        if prev_cci <= 0 and current_cci > 0:
+            mask |= 4
+        elif prev_cci >= 0 and current_cci < 0:
+            mask |= 8
+    return mask
+
+
+@njit('u4(f8[:], f8)', cache=True, nogil=True)
+def _volume_kernel(volume: np.ndarray, avg_volume: float) -> int:
+    """成交量相对前19根平均值的放大与萎缩"""
+    mask = 0
+    if np.isnan(avg_volume):
+        return mask
+    
+    current_volume = volume[-1]
+    if current_volume > avg_volume * 2:
+        mask |= 1
+    elif current_volume < avg_volume * 0.5:
+        mask |= 2
+    return mask
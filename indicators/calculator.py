@@ -3,16 +3,52 @@
 实现各种技术指标的计算功能
 """
 import logging
+import os
+from math import isnan, nan
 import numpy as np
-import pandas as pd
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 import talib
+import talib.stream as talib_stream
 
-from config.settings import TECHNICAL_INDICATORS
-from database.mongo_client import mongodb_client
+from config.settings import TECHNICAL_INDICATORS, HISTORICAL_LIMIT
+from database.mongo_client import mongodb_client, BULK_UPDATE_BATCH_SIZE
+from indicators._kdj_loop import _kdj_loop
+from indicators._ma_loop import _sma_last
+from indicators._njit import NUMBA_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# 批量计算的并发线程数：每个交易对/周期的耗时主要是读取MongoDB，线程可重叠等待
+BATCH_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+# 参与计算的价格与成交量列
+# 统一使用float64：TA-Lib只接受double输入，且float32仅约7位有效数字，高价币种会损失到小数点后两位
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# 指标定义：结果字段名、计算函数、输入序列名、计算参数、各输出对应的子字段名（单值指标为None）
+IndicatorSpec = namedtuple('IndicatorSpec', 'name fn args kwargs fields')
+
+
+def _last_value(value) -> Optional[float]:
+    """取指标的最新值（序列取最后一个元素），NaN（数据不足）返回None"""
+    if isinstance(value, np.ndarray):
+        value = value[-1]
+    value = float(value)
+    return None if isnan(value) else value
+
+
+def _last_values(result) -> Tuple[Optional[float], ...]:
+    """
+    将指标函数的返回值统一为各输出最新值组成的元组
+    
+    普通函数返回序列（多输出时为序列元组）；talib.stream函数只计算最新值，直接返回数值。
+    """
+    if not isinstance(result, tuple):
+        result = (result,)
+    return tuple(map(_last_value, result))
+
 
 class TechnicalIndicatorCalculator:
     """技术指标计算器"""
@@ -20,8 +56,16 @@ class TechnicalIndicatorCalculator:
     def __init__(self):
         """初始化技术指标计算器"""
         self.config = TECHNICAL_INDICATORS
+        specs = self._build_specs()
+        # 结果字典模板，按指标顺序预先排好字段，每次计算复制一份
+        self._result_template = dict.fromkeys(spec.name for spec in specs)
+        # 参数完全相同的指标（如随机振荡器与慢速KD配置一致时）只计算一次
+        self._specs, self._aliases = self._dedupe_specs(specs)
+        # 所有指标都能算出最新值所需的最少K线数量，每次只读取最近的这一段K线
+        self._min_bars = self._required_bars()
+        self._window = max(HISTORICAL_LIMIT, self._min_bars)
     
-    def prepare_data(self, historical_data: List[Dict]) -> Optional[pd.DataFrame]:
+    def prepare_data(self, historical_data: List[Dict]) -> Optional[Dict[str, np.ndarray]]:
         """
         准备计算所需的数据
         
@@ -29,354 +73,271 @@ class TechnicalIndicatorCalculator:
             historical_data: 历史K线数据
             
         Returns:
-            Optional[pd.DataFrame]: 处理后的DataFrame
+            Optional[Dict[str, np.ndarray]]: 列名 -> 数据序列，时间戳为datetime64[ms]，价格与成交量为float64
         """
         try:
             if not historical_data:
                 logger.warning("历史数据为空，无法计算技术指标")
                 return None
             
-            # 转换为DataFrame
-            df = pd.DataFrame(historical_data)
+            count = len(historical_data)
+            data = {}
             
-            # 确保必要的列存在
-            required_columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            for col in required_columns:
-                if col not in df.columns:
-                    logger.error(f"缺少必要的数据列: {col}")
-                    return None
-            
-            # 设置时间戳为索引
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df.set_index('timestamp', inplace=True)
+            # 逐列直接构建数组，确保必要的列存在
+            try:
+                data['timestamp'] = np.array([kline['timestamp'] for kline in historical_data], dtype='datetime64[ms]')
+                for col in PRICE_COLUMNS:
+                    data[col] = np.fromiter((kline[col] for kline in historical_data), dtype=np.float64, count=count)
+            except KeyError as e:
+                logger.error("缺少必要的数据列: %s", e.args[0])
+                return None
             
-            # 确保数据按时间排序
-            df.sort_index(inplace=True)
+            # 数据库查询结果已按时间正序排列，仅在乱序时重新排序
+            timestamps = data['timestamp']
+            if count > 1 and (timestamps[1:] < timestamps[:-1]).any():
+                order = np.argsort(timestamps, kind='stable')
+                data = {col: values[order] for col, values in data.items()}
             
-            logger.debug(f"成功准备数据，数据量: {len(df)}")
-            return df
+            logger.debug("成功准备数据，数据量: %s", count)
+            return data
             
         except Exception as e:
-            logger.error(f"数据准备失败: {e}")
+            logger.error("数据准备失败: %s", e)
             return None
     
-    def calculate_moving_averages(self, df: pd.DataFrame) -> Dict:
+    def _build_specs(self) -> Tuple[IndicatorSpec, ...]:
         """
-        计算移动平均线
+        根据配置构建指标分派表
         
-        Args:
-            df: K线数据DataFrame
-            
         Returns:
-            Dict: 移动平均线数据
-        """
-        try:
-            ma_data = {}
-            
-            for period in self.config['MA_PERIODS']:
-                ma_values = talib.SMA(df['close'].values, timeperiod=period)
-                ma_data[f'ma{period}'] = float(ma_values[-1]) if not np.isnan(ma_values[-1]) else None
-            
-            logger.debug(f"计算移动平均线完成: {list(ma_data.keys())}")
-            return ma_data
-            
-        except Exception as e:
-            logger.error(f"计算移动平均线失败: {e}")
-            return {}
-    
-    def calculate_rsi(self, df: pd.DataFrame) -> Optional[float]:
+            Tuple[IndicatorSpec, ...]: 按计算顺序排列的指标定义
         """
-        计算相对强弱指数(RSI)
+        config = self.config
+        hlc = ('high', 'low', 'close')
         
-        Args:
-            df: K线数据DataFrame
-            
-        Returns:
-            Optional[float]: RSI值
-        """
-        try:
-            rsi_values = talib.RSI(df['close'].values, timeperiod=self.config['RSI_PERIOD'])
-            rsi = float(rsi_values[-1]) if not np.isnan(rsi_values[-1]) else None
-            
-            logger.debug(f"计算RSI完成: {rsi}")
-            return rsi
-            
-        except Exception as e:
-            logger.error(f"计算RSI失败: {e}")
-            return None
-    
-    def calculate_macd(self, df: pd.DataFrame) -> Dict:
-        """
-        计算MACD指标
+        # 只依赖固定窗口的指标（STOCH、BBANDS、CCI）使用talib.stream只计算最新值；
+        # RSI、MACD基于指数平滑，stream只用最近一段数据起算，结果与全序列计算不一致，仍计算全序列
         
-        Args:
-            df: K线数据DataFrame
-            
-        Returns:
-            Dict: MACD数据
-        """
-        try:
-            macd, signal, histogram = talib.MACD(
-                df['close'].values,
-                fastperiod=self.config['MACD_FAST'],
-                slowperiod=self.config['MACD_SLOW'],
-                signalperiod=self.config['MACD_SIGNAL']
-            )
-            
-            macd_data = {
-                'macd': float(macd[-1]) if not np.isnan(macd[-1]) else None,
-                'signal': float(signal[-1]) if not np.isnan(signal[-1]) else None,
-                'histogram': float(histogram[-1]) if not np.isnan(histogram[-1]) else None,
-            }
-            
-            logger.debug(f"计算MACD完成: {macd_data}")
-            return macd_data
-            
-        except Exception as e:
-            logger.error(f"计算MACD失败: {e}")
-            return {}
+        ma_periods = tuple(config['MA_PERIODS'])
+        
+        return (
+            # 移动平均线，所有周期一次计算
+            IndicatorSpec('ma', self.calculate_moving_averages, ('close',),
+                          {'periods': np.asarray(ma_periods, dtype=np.int64)},
+                          tuple(f'ma{period}' for period in ma_periods)),
+            # RSI
+            IndicatorSpec('rsi', talib.RSI, ('close',), {'timeperiod': config['RSI_PERIOD']}, None),
+            # MACD
+            IndicatorSpec('macd', talib.MACD, ('close',), {
+                'fastperiod': config['MACD_FAST'],
+                'slowperiod': config['MACD_SLOW'],
+                'signalperiod': config['MACD_SIGNAL'],
+            }, ('macd', 'signal', 'histogram')),
+            # 随机振荡器
+            IndicatorSpec('stochastic', talib_stream.STOCH, hlc, {
+                'fastk_period': config['STOCH_K'],
+                'slowk_period': config['STOCH_D'],
+                'slowd_period': config['STOCH_D'],
+            }, ('k', 'd')),
+            # 布林带
+            IndicatorSpec('bollinger', talib_stream.BBANDS, ('close',), {
+                'timeperiod': config['BB_PERIOD'],
+                'nbdevup': config['BB_STD'],
+                'nbdevdn': config['BB_STD'],
+            }, ('upper', 'middle', 'lower')),
+            # CCI
+            IndicatorSpec('cci', talib_stream.CCI, hlc, {'timeperiod': config['CCI_PERIOD']}, None),
+            # KDJ
+            IndicatorSpec('kdj', self.calculate_kdj, hlc, {'timeperiod': config['KDJ_PERIOD']}, ('k', 'd', 'j')),
+            # 慢速KD（TA-Lib的慢速随机振荡器）
+            IndicatorSpec('skdj', talib_stream.STOCH, hlc, {
+                'fastk_period': config['KDJ_PERIOD'],
+                'slowk_period': config['KDJ_SMOOTH'],
+                'slowd_period': config['KDJ_SMOOTH'],
+            }, ('k', 'd')),
+        )
     
-    def calculate_stochastic(self, df: pd.DataFrame) -> Dict:
+    @staticmethod
+    def _dedupe_specs(specs: Tuple[IndicatorSpec, ...]) -> Tuple[Tuple[IndicatorSpec, ...], Tuple[Tuple[str, str], ...]]:
         """
-        计算随机振荡器
+        合并计算函数、输入与参数都相同的指标
         
         Args:
-            df: K线数据DataFrame
+            specs: 指标定义
             
         Returns:
-            Dict: 随机振荡器数据
+            Tuple: 需要实际计算的指标定义，以及 (重复指标名, 复用的指标名) 列表
         """
-        try:
-            slowk, slowd = talib.STOCH(
-                df['high'].values,
-                df['low'].values,
-                df['close'].values,
-                fastk_period=self.config['STOCH_K'],
-                slowk_period=self.config['STOCH_D'],
-                slowd_period=self.config['STOCH_D']
-            )
-            
-            stoch_data = {
-                'k': float(slowk[-1]) if not np.isnan(slowk[-1]) else None,
-                'd': float(slowd[-1]) if not np.isnan(slowd[-1]) else None,
-            }
-            
-            logger.debug(f"计算随机振荡器完成: {stoch_data}")
-            return stoch_data
-            
-        except Exception as e:
-            logger.error(f"计算随机振荡器失败: {e}")
-            return {}
+        unique = []
+        aliases = []
+        for spec in specs:
+            source = next((
+                other for other in unique
+                if other.fn is spec.fn and other.args == spec.args
+                and other.fields == spec.fields and other.kwargs == spec.kwargs
+            ), None)
+            if source is None:
+                unique.append(spec)
+            else:
+                aliases.append((spec.name, source.name))
+        return tuple(unique), tuple(aliases)
     
-    def calculate_bollinger_bands(self, df: pd.DataFrame) -> Dict:
+    def _required_bars(self) -> int:
         """
-        计算布林带
+        根据配置计算各指标最新值不为NaN所需的最少K线数量
         
-        Args:
-            df: K线数据DataFrame
-            
         Returns:
-            Dict: 布林带数据
+            int: 最少K线数量
         """
-        try:
-            upper, middle, lower = talib.BBANDS(
-                df['close'].values,
-                timeperiod=self.config['BB_PERIOD'],
-                nbdevup=self.config['BB_STD'],
-                nbdevdn=self.config['BB_STD']
-            )
-            
-            bb_data = {
-                'upper': float(upper[-1]) if not np.isnan(upper[-1]) else None,
-                'middle': float(middle[-1]) if not np.isnan(middle[-1]) else None,
-                'lower': float(lower[-1]) if not np.isnan(lower[-1]) else None,
-            }
-            
-            logger.debug(f"计算布林带完成: {bb_data}")
-            return bb_data
-            
-        except Exception as e:
-            logger.error(f"计算布林带失败: {e}")
-            return {}
+        config = self.config
+        return max(
+            max(config['MA_PERIODS'], default=1),
+            config['RSI_PERIOD'] + 1,
+            config['MACD_SLOW'] + config['MACD_SIGNAL'] - 1,
+            config['STOCH_K'] + 2 * config['STOCH_D'] - 2,
+            config['BB_PERIOD'],
+            config['CCI_PERIOD'],
+            config['KDJ_PERIOD'] + 2 * config['KDJ_SMOOTH'] - 2,
+        )
     
-    def calculate_cci(self, df: pd.DataFrame) -> Optional[float]:
+    @staticmethod
+    def calculate_moving_averages(close: np.ndarray, periods: np.ndarray) -> Tuple[float, ...]:
         """
-        计算商品通道指数(CCI)
+        计算各周期移动平均线的最新值
+        
+        安装numba时由编译后的内核直接累加各周期的尾部；否则对倒序的收盘价做一次累加，
+        周期p的均线即为前p项之和除以p，所有周期共用一次扫描。
         
         Args:
-            df: K线数据DataFrame
+            close: 收盘价序列
+            periods: 均线周期（int64数组）
             
         Returns:
-            Optional[float]: CCI值
+            Tuple[float, ...]: 各周期均线的最新值，数据不足时为NaN
         """
-        try:
-            cci_values = talib.CCI(
-                df['high'].values,
-                df['low'].values,
-                df['close'].values,
-                timeperiod=self.config['CCI_PERIOD']
-            )
-            
-            cci = float(cci_values[-1]) if not np.isnan(cci_values[-1]) else None
-            
-            logger.debug(f"计算CCI完成: {cci}")
-            return cci
-            
-        except Exception as e:
-            logger.error(f"计算CCI失败: {e}")
-            return None
+        if NUMBA_AVAILABLE:
+            return tuple(_sma_last(close, periods))
+        
+        tail_sums = np.cumsum(close[::-1])
+        count = len(tail_sums)
+        return tuple(tail_sums[period - 1] / period if 0 < period <= count else nan for period in periods)
     
-    def calculate_kdj(self, df: pd.DataFrame) -> Dict:
+    @staticmethod
+    def calculate_kdj(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                      timeperiod: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         计算KDJ指标
         
         Args:
-            df: K线数据DataFrame
+            high: 最高价序列
+            low: 最低价序列
+            close: 收盘价序列
+            timeperiod: RSV窗口长度
             
         Returns:
-            Dict: KDJ数据
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: K、D、J序列
         """
-        try:
-            # 计算RSV
-            low_min = df['low'].rolling(window=self.config['KDJ_PERIOD']).min()
-            high_max = df['high'].rolling(window=self.config['KDJ_PERIOD']).max()
-            rsv = (df['close'] - low_min) / (high_max - low_min) * 100
-            
-            # 计算K值
-            k_values = []
-            k = 50  # 初始值
-            for rsv_val in rsv:
-                if not np.isnan(rsv_val):
-                    k = (2/3) * k + (1/3) * rsv_val
-                k_values.append(k)
-            
-            # 计算D值
-            d_values = []
-            d = 50  # 初始值
-            for k_val in k_values:
-                d = (2/3) * d + (1/3) * k_val
-                d_values.append(d)
-            
-            # 计算J值
-            j_values = [3 * k_val - 2 * d_val for k_val, d_val in zip(k_values, d_values)]
-            
-            kdj_data = {
-                'k': float(k_values[-1]) if k_values else None,
-                'd': float(d_values[-1]) if d_values else None,
-                'j': float(j_values[-1]) if j_values else None,
-            }
-            
-            logger.debug(f"计算KDJ完成: {kdj_data}")
-            return kdj_data
-            
-        except Exception as e:
-            logger.error(f"计算KDJ失败: {e}")
-            return {}
+        # 计算RSV（区间最高价等于最低价时为NaN）
+        low_min = talib.MIN(low, timeperiod=timeperiod)
+        high_max = talib.MAX(high, timeperiod=timeperiod)
+        # 在同一个缓冲区上依次相减、相除、乘100，避免每一步分配新数组
+        price_range = np.subtract(high_max, low_min)
+        flat = price_range == 0
+        rsv = np.subtract(close, low_min)
+        np.divide(rsv, price_range, out=rsv, where=~flat)
+        np.multiply(rsv, 100.0, out=rsv)
+        rsv[flat] = np.nan
+        
+        # 递推计算K、D、J值
+        return _kdj_loop(rsv)
     
-    def calculate_skdj(self, df: pd.DataFrame) -> Dict:
+    def compute_last_values(self, close: np.ndarray, high: np.ndarray, low: np.ndarray) -> Dict:
         """
-        计算慢速KD指标
+        按分派表依次计算所有技术指标，只保留最新一根K线的值
         
         Args:
-            df: K线数据DataFrame
+            close: 收盘价序列
+            high: 最高价序列
+            low: 最低价序列
             
         Returns:
-            Dict: 慢速KD数据
+            Dict: 技术指标数据，无法计算的值为None
         """
+        series = {'close': close, 'high': high, 'low': low}.__getitem__
+        last_values = _last_values
+        indicators = self._result_template.copy()
+        
         try:
-            # 使用TA-Lib的慢速随机振荡器
-            slowk, slowd = talib.STOCH(
-                df['high'].values,
-                df['low'].values,
-                df['close'].values,
-                fastk_period=self.config['KDJ_PERIOD'],
-                slowk_period=self.config['KDJ_SMOOTH'],
-                slowd_period=self.config['KDJ_SMOOTH']
-            )
-            
-            skdj_data = {
-                'k': float(slowk[-1]) if not np.isnan(slowk[-1]) else None,
-                'd': float(slowd[-1]) if not np.isnan(slowd[-1]) else None,
-            }
-            
-            logger.debug(f"计算慢速KD完成: {skdj_data}")
-            return skdj_data
-            
-        except Exception as e:
-            logger.error(f"计算慢速KD失败: {e}")
-            return {}
+            for name, fn, args, kwargs, fields in self._specs:
+                values = last_values(fn(*map(series, args), **kwargs))
+                indicators[name] = values[0] if fields is None else dict(zip(fields, values))
+        except Exception:
+            # 循环变量即为出错的指标
+            logger.error("计算指标 %s 失败", name)
+            raise
+        
+        for name, source in self._aliases:
+            value = indicators[source]
+            indicators[name] = dict(value) if isinstance(value, dict) else value
+        
+        logger.debug("计算技术指标完成: %s", indicators)
+        return indicators
     
-    def calculate_all_indicators(self, symbol: str, timeframe: str) -> bool:
+    def calculate_all_indicators(self, symbol: str, timeframe: str,
+                                 pending_updates: Optional[List[Tuple[Dict, Dict]]] = None) -> bool:
         """
         计算指定交易对和时间周期的所有技术指标
         
         Args:
             symbol: 币种符号
             timeframe: 时间周期
+            pending_updates: 批量更新缓冲区，指定时计算结果追加到其中由调用方统一写入
             
         Returns:
             bool: 计算是否成功
         """
         try:
             # 获取历史数据
-            historical_data = mongodb_client.get_historical_data(symbol, timeframe)
+            historical_data = mongodb_client.get_historical_data(symbol, timeframe, limit=self._window)
             
             if not historical_data:
-                logger.warning(f"无历史数据用于计算技术指标: {symbol} {timeframe}")
+                logger.warning("无历史数据用于计算技术指标: %s %s", symbol, timeframe)
                 return False
             
             # 准备数据
-            df = self.prepare_data(historical_data)
-            if df is None:
+            data = self.prepare_data(historical_data)
+            if data is None:
                 return False
             
             # 需要足够的数据来计算技术指标
-            if len(df) < 50:
-                logger.warning(f"数据量不足，无法计算技术指标: {symbol} {timeframe}, 数据量: {len(df)}")
+            count = len(data['close'])
+            if count < self._min_bars:
+                logger.warning("数据量不足，无法计算技术指标: %s %s, 数据量: %s", symbol, timeframe, count)
                 return False
             
             # 计算各项技术指标
-            indicators = {}
-            
-            # 移动平均线
-            indicators['ma'] = self.calculate_moving_averages(df)
-            
-            # RSI
-            indicators['rsi'] = self.calculate_rsi(df)
-            
-            # MACD
-            indicators['macd'] = self.calculate_macd(df)
-            
-            # 随机振荡器
-            indicators['stochastic'] = self.calculate_stochastic(df)
-            
-            # 布林带
-            indicators['bollinger'] = self.calculate_bollinger_bands(df)
-            
-            # CCI
-            indicators['cci'] = self.calculate_cci(df)
-            
-            # KDJ
-            indicators['kdj'] = self.calculate_kdj(df)
-            
-            # 慢速KD
-            indicators['skdj'] = self.calculate_skdj(df)
+            indicators = self.compute_last_values(data['close'], data['high'], data['low'])
             
             # 更新数据库中最新的K线数据
-            latest_timestamp = df.index[-1].to_pydatetime()
+            latest_timestamp = data['timestamp'][-1].item()
+            if pending_updates is not None:
+                query = {'symbol': symbol, 'timeframe': timeframe, 'timestamp': latest_timestamp}
+                pending_updates.append((query, indicators))
+                return True
+            
             success = mongodb_client.update_technical_indicators(
                 symbol, timeframe, latest_timestamp, indicators
             )
             
             if success:
-                logger.info(f"成功计算并更新技术指标: {symbol} {timeframe}")
+                logger.info("成功计算并更新技术指标: %s %s", symbol, timeframe)
             else:
-                logger.error(f"更新技术指标失败: {symbol} {timeframe}")
+                logger.error("更新技术指标失败: %s %s", symbol, timeframe)
             
             return success
             
         except Exception as e:
-            logger.error(f"计算技术指标失败 {symbol} {timeframe}: {e}")
+            logger.error("计算技术指标失败 %s %s: %s", symbol, timeframe, e)
             return False
     
     def batch_calculate_indicators(self) -> bool:
@@ -388,20 +349,62 @@ class TechnicalIndicatorCalculator:
         """
         from config.settings import SYMBOLS, TIMEFRAMES, SYMBOL_MAPPING
         
+        pairs = [
+            (SYMBOL_MAPPING.get(symbol_pair, symbol_pair), timeframe)
+            for symbol_pair in SYMBOLS
+            for timeframe in TIMEFRAMES
+        ]
         success_count = 0
-        total_count = len(SYMBOLS) * len(TIMEFRAMES)
+        total_count = len(pairs)
+        pending_updates = []
         
         logger.info("开始批量计算技术指标...")
         
-        for symbol_pair in SYMBOLS:
-            symbol = SYMBOL_MAPPING.get(symbol_pair, symbol_pair)
-            for timeframe in TIMEFRAMES:
-                if self.calculate_all_indicators(symbol, timeframe):
+        # 各交易对/周期并发计算，计算结果在当前线程汇总并批量写入
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_WORKERS, total_count))) as executor:
+            for success, updates in executor.map(lambda pair: self._calculate_pair(*pair), pairs):
+                if success:
                     success_count += 1
+                pending_updates.extend(updates)
+                if len(pending_updates) >= BULK_UPDATE_BATCH_SIZE:
+                    success_count -= self._flush_updates(pending_updates)
+        
+        success_count -= self._flush_updates(pending_updates)
         
-        logger.info(f"技术指标计算完成，成功: {success_count}/{total_count}")
+        logger.info("技术指标计算完成，成功: %s/%s", success_count, total_count)
         return success_count > 0
     
+    def _calculate_pair(self, symbol: str, timeframe: str) -> Tuple[bool, List[Tuple[Dict, Dict]]]:
+        """
+        计算单个交易对/周期的技术指标，结果放入独立的缓冲区（供工作线程调用）
+        
+        Args:
+            symbol: 币种符号
+            timeframe: 时间周期
+            
+        Returns:
+            Tuple[bool, List[Tuple[Dict, Dict]]]: 是否成功，待写入的更新
+        """
+        updates = []
+        return self.calculate_all_indicators(symbol, timeframe, updates), updates
+    
+    @staticmethod
+    def _flush_updates(pending_updates: List[Tuple[Dict, Dict]]) -> int:
+        """
+        将缓冲的技术指标更新批量写入数据库并清空缓冲区
+        
+        Args:
+            pending_updates: 批量更新缓冲区
+            
+        Returns:
+            int: 写入失败的更新数量
+        """
+        if not pending_updates:
+            return 0
+        failed = len(pending_updates) if mongodb_client.bulk_update(pending_updates) is None else 0
+        pending_updates.clear()
+        return failed
+    
     def calculate_indicators_for_symbol_timeframe(self, symbol: str, timeframe: str) -> bool:
         """
         为特定币种和时间周期计算技术指标（用于新数据触发的实时计算）
@@ -414,10 +417,10 @@ class TechnicalIndicatorCalculator:
             bool: 计算是否成功
         """
         try:
-            logger.debug(f"开始计算技术指标: {symbol} {timeframe}")
+            logger.debug("开始计算技术指标: %s %s", symbol, timeframe)
             return self.calculate_all_indicators(symbol, timeframe)
         except Exception as e:
-            logger.error(f"计算技术指标失败 {symbol} {timeframe}: {e}")
+            logger.error("计算技术指标失败 %s %s: %s", symbol, timeframe, e)
             return False
 
 
@@ -2,6 +2,7 @@
 初始化历史数据脚本
 用于一次性采集足够的历史数据来计算技术指标
 """
+import asyncio
 import logging
 from data_collector.ccxt_collector import data_collector
 from indicators.calculator import indicator_calculator
@@ -21,7 +22,7 @@ def main():
     try:
         # 1. 采集历史数据
         print("\n📈 1. 采集历史K线数据...")
-        success = data_collector.collect_and_store_data()
+        success = asyncio.run(data_collector.collect_and_store_data())
         
         if not success:
             print("❌ 历史数据采集失败")
@@ -10,6 +10,7 @@
 5. 使用MongoDB存储所有数据
 
 """
+import asyncio
 import signal
 import sys
 import time
@@ -77,7 +78,7 @@ class CryptoAnalysisSystem:
         
         try:
             # 采集初始历史数据
-            success = data_collector.collect_and_store_data()
+            success = asyncio.run(data_collector.collect_and_store_data())
             
             if not success:
                 logger.warning("初始数据采集部分失败，但系统将继续运行")
@@ -154,7 +155,7 @@ class CryptoAnalysisSystem:
         try:
             # 数据采集
             logger.info("1. 数据采集...")
-            data_collector.collect_latest_data()
+            asyncio.run(data_collector.collect_latest_data())
             
             # 技术指标计算
             logger.info("2. 技术指标计算...")
@@ -0,0 +1,84 @@
+"""
+K线唯一索引迁移脚本
+删除 (币种, 周期, 时间) 相同的重复K线，建立唯一索引后再删除旧版本的非唯一索引
+
+运行前请停止数据采集进程（调度器、start_collector.py），避免迁移期间写入新的重复K线。
+任何一步失败都会中止迁移并以非零状态退出，旧索引在唯一索引建立成功之前不会被删除。
+"""
+import logging
+import sys
+from pymongo import DESCENDING
+from database.mongo_client import (
+    mongodb_client, KLINE_LOOKUP_INDEX, KLINE_LOOKUP_INDEX_NAME, LEGACY_KLINE_LOOKUP_INDEX_NAME
+)
+from utils.logger import setup_logging
+
+# 设置日志
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def remove_duplicate_klines(collection) -> int:
+    """
+    删除 (币种, 周期, 时间) 相同的重复K线，每组保留最近更新的一条
+    
+    Args:
+        collection: K线集合
+        
+    Returns:
+        int: 删除的K线数量
+    """
+    pipeline = [
+        {'$sort': {'updated_at': DESCENDING}},
+        {'$group': {
+            '_id': {'symbol': '$symbol', 'timeframe': '$timeframe', 'timestamp': '$timestamp'},
+            'ids': {'$push': '$_id'},
+            'count': {'$sum': 1}
+        }},
+        {'$match': {'count': {'$gt': 1}}}
+    ]
+    
+    removed = 0
+    for group in collection.aggregate(pipeline, allowDiskUse=True):
+        result = collection.delete_many({'_id': {'$in': group['ids'][1:]}})
+        removed += result.deleted_count
+    return removed
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🚀 开始迁移K线唯一索引...")
+    print("=" * 60)
+    
+    collection = mongodb_client.collection
+    
+    try:
+        existing_indexes = collection.index_information()
+        
+        # 1. 删除重复的K线
+        print("\n🧹 1. 删除重复的K线...")
+        removed = remove_duplicate_klines(collection)
+        print(f"✅ 已删除重复的K线: {removed}条")
+        
+        # 2. 建立唯一索引（已存在时为空操作）
+        print("\n📇 2. 建立唯一索引...")
+        collection.create_index(KLINE_LOOKUP_INDEX, name=KLINE_LOOKUP_INDEX_NAME, unique=True)
+        print(f"✅ 唯一索引已建立: {KLINE_LOOKUP_INDEX_NAME}")
+        
+        # 3. 唯一索引建立成功后才删除旧索引
+        if LEGACY_KLINE_LOOKUP_INDEX_NAME in existing_indexes:
+            print("\n🗑️ 3. 删除旧的非唯一索引...")
+            collection.drop_index(LEGACY_KLINE_LOOKUP_INDEX_NAME)
+            print(f"✅ 旧索引已删除: {LEGACY_KLINE_LOOKUP_INDEX_NAME}")
+        
+        print("\n🎉 K线唯一索引迁移完成！")
+        
+    except Exception as e:
+        logger.error(f"迁移失败: {e}")
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
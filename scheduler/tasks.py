@@ -2,6 +2,7 @@
 定时任务管理模块
 负责调度数据采集、技术指标计算和信号检测等任务
 """
+import asyncio
 import logging
 from typing import Optional
 from apscheduler.schedulers.blocking import BlockingScheduler
@@ -109,7 +110,7 @@ class TaskScheduler:
             logger.info("开始执行数据采集任务...")
             
             # 采集最新数据
-            success = data_collector.collect_latest_data()
+            success = asyncio.run(data_collector.collect_latest_data())
             
             if success:
                 logger.info("数据采集任务执行成功")
@@ -46,4 +46,11 @@ async def main():
     await service.start()
 
 if __name__ == "__main__":
+    # 优先使用uvloop事件循环，未安装时回退到默认事件循环
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
@@ -2,6 +2,7 @@
 """
 数据采集服务启动脚本
 """
+import asyncio
 import logging
 import time
 import signal
@@ -34,7 +35,7 @@ class DataCollectionService:
                 logger.info("开始数据采集...")
                 
                 # 采集最新数据
-                success = data_collector.collect_latest_data()
+                success = asyncio.run(data_collector.collect_latest_data())
                 if success:
                     logger.info("数据采集成功")
                     
@@ -73,7 +73,7 @@ class DataCollectionTester:
         """测试数据采集"""
         try:
             # 测试获取最新K线数据
-            success = data_collector.collect_latest_data()
+            success = asyncio.run(data_collector.collect_latest_data())
             if success:
                 logger.info("数据采集成功")
                 return True
@@ -98,7 +98,7 @@ class DataCollectionTester:
             logger.info(f"初始数据记录数: {initial_count}")
             
             # 再次采集
-            success = data_collector.collect_latest_data()
+            success = asyncio.run(data_collector.collect_latest_data())
             
             # 检查是否有新数据（可能没有，因为是实时数据）
             final_count = 0
@@ -5,7 +5,7 @@
 import uuid
 import time
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
@@ -16,6 +16,26 @@ def datetime_serializer(obj):
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
 
+# 按秒缓存的ISO时间字符串：[秒级时间戳, 格式化结果]
+_TS_CACHE: List[Any] = [0, ""]
+
+
+def now_iso() -> str:
+    """
+    获取当前UTC时间的ISO格式字符串（秒级缓存，避免每个请求都创建datetime对象）
+    
+    与 datetime.utcnow().isoformat() 格式相同（不带时区偏移），但精度为秒，不含微秒。
+    
+    Returns:
+        str: 如 2024-01-01T00:00:00
+    """
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[1] = datetime.utcfromtimestamp(now).isoformat()
+        _TS_CACHE[0] = now
+    return _TS_CACHE[1]
+
+
 class RequestIDGenerator:
     """请求ID生成器"""
     
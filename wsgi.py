@@ -0,0 +1,13 @@
+"""
+WSGI入口
+供gunicorn + gevent在生产环境中运行API服务：
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+# gevent补丁必须在其他模块导入之前应用，确保pymongo等库的socket I/O可被协程调度
+from gevent import monkey
+monkey.patch_all()
+
+from api.app import create_app  # noqa: E402
+
+application = create_app()